@@ -417,12 +417,16 @@ def poll_database_for_alerts(
                 query = text("""
                     SELECT 
                         fa.id, fa.transaction_id, fa.fraud_probability, fa.explanation,
-                        t.transaction_type, t.amount, t.name_orig, t.name_dest,
+                        t.transaction_type, t.amount, ao.name AS name_orig, ad.name AS name_dest,
                         t.old_balance_orig, t.new_balance_orig, t.old_balance_dest, t.new_balance_dest
                     FROM 
                         fraud_alerts fa
                     JOIN 
                         transactions t ON fa.transaction_id = t.transaction_id
+                    JOIN 
+                        accounts ao ON t.orig_account_id = ao.id
+                    JOIN 
+                        accounts ad ON t.dest_account_id = ad.id
                     WHERE 
                         fa.timestamp > :last_check_time
                         AND fa.is_reviewed = FALSE
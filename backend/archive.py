@@ -0,0 +1,372 @@
+"""
+archive.py - Retention job that moves old transactions and alerts to Parquet.
+
+Rows older than a retention horizon are copied out of the `transactions` and
+`fraud_alerts` tables into zstd-compressed Parquet files and then deleted, one
+small chunk per database transaction so writers are never blocked for long.
+Files are laid out by month (`year=YYYY/month=MM`), which gives archived data
+the same time partitioning that investigations query by.
+
+Native MySQL RANGE partitioning is not used: it requires every unique key to
+include the partitioning column and does not support foreign keys, and both
+`transactions.transaction_id` and `fraud_alerts.transaction_id` rely on them.
+
+Usage:
+    python archive.py [--horizon-days DAYS] [--chunk-size ROWS] [--archive-dir DIR]
+"""
+
+import os
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from db_models import Account, Transaction, FraudAlert, SessionLocal, adjust_transaction_stats, transaction_detail_cache
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Where archived Parquet files are written
+ARCHIVE_DIR = os.getenv(
+    "ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive")
+)
+
+# Rows older than this many days are moved to the archive
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+
+# Rows moved per database transaction
+ARCHIVE_CHUNK_SIZE = 5000
+
+TRANSACTION_COLUMNS = [
+    "id", "transaction_id", "transaction_type", "amount",
+    "name_orig", "old_balance_orig", "new_balance_orig",
+    "name_dest", "old_balance_dest", "new_balance_dest",
+    "is_fraud", "fraud_probability", "timestamp"
+]
+
+ALERT_COLUMNS = [
+    "id", "transaction_id", "fraud_probability", "explanation", "timestamp",
+    "is_reviewed", "reviewed_by", "review_timestamp", "review_notes"
+]
+
+def arrow_schemas():
+    """Build the Parquet schemas for archived tables (imports pyarrow lazily)."""
+    import pyarrow as pa
+
+    transactions_schema = pa.schema([
+        ("id", pa.int64()),
+        ("transaction_id", pa.string()),
+        ("transaction_type", pa.string()),
+        ("amount", pa.float64()),
+        ("name_orig", pa.string()),
+        ("old_balance_orig", pa.float64()),
+        ("new_balance_orig", pa.float64()),
+        ("name_dest", pa.string()),
+        ("old_balance_dest", pa.float64()),
+        ("new_balance_dest", pa.float64()),
+        ("is_fraud", pa.bool_()),
+        ("fraud_probability", pa.float64()),
+        ("timestamp", pa.timestamp("us")),
+    ])
+    alerts_schema = pa.schema([
+        ("id", pa.int64()),
+        ("transaction_id", pa.string()),
+        ("fraud_probability", pa.float64()),
+        ("explanation", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("is_reviewed", pa.bool_()),
+        ("reviewed_by", pa.string()),
+        ("review_timestamp", pa.timestamp("us")),
+        ("review_notes", pa.string()),
+    ])
+    return transactions_schema, alerts_schema
+
+def _write_parquet(rows: List[Dict[str, Any]], schema, path: str) -> None:
+    """
+    Write rows to a Parquet file atomically.
+
+    Args:
+        rows: Rows as dictionaries
+        schema: Arrow schema for the file
+        path: Destination path
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pylist(rows, schema=schema)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+def _partition_dir(archive_dir: str, table_name: str, timestamp: Optional[datetime]) -> str:
+    """Return the month partition directory for a row timestamp."""
+    timestamp = timestamp or datetime(1970, 1, 1)
+    return os.path.join(archive_dir, table_name, f"year={timestamp.year:04d}", f"month={timestamp.month:02d}")
+
+def archive_chunk(db: Session, cutoff: datetime, archive_dir: str, chunk_size: int) -> int:
+    """
+    Move the oldest chunk of rows older than cutoff into the archive.
+
+    The chunk is written to Parquet before anything is deleted. File names
+    are derived from the first and last archived id, so a chunk that is
+    re-run after a crash overwrites its own file instead of duplicating it.
+
+    Args:
+        db: Database session
+        cutoff: Rows with timestamp before this are archived
+        archive_dir: Root directory of the archive
+        chunk_size: Maximum number of transactions to move
+
+    Returns:
+        Number of transactions archived (0 when nothing is left to do)
+    """
+    transactions = db.query(Transaction).filter(
+        or_(Transaction.timestamp < cutoff, Transaction.timestamp.is_(None))
+    ).order_by(Transaction.timestamp, Transaction.id).limit(chunk_size).all()
+
+    if not transactions:
+        return 0
+
+    transaction_ids = [t.transaction_id for t in transactions]
+    alerts = db.query(FraudAlert).filter(FraudAlert.transaction_id.in_(transaction_ids)).all()
+
+    transactions_schema, alerts_schema = arrow_schemas()
+
+    # Group rows by month so each file belongs to exactly one partition
+    transaction_parts: Dict[str, List[Dict[str, Any]]] = {}
+    for t in transactions:
+        row = {column: getattr(t, column) for column in TRANSACTION_COLUMNS}
+        transaction_parts.setdefault(_partition_dir(archive_dir, "transactions", t.timestamp), []).append(row)
+
+    alert_parts: Dict[str, List[Dict[str, Any]]] = {}
+    timestamps = {t.transaction_id: t.timestamp for t in transactions}
+    for alert in alerts:
+        row = {column: getattr(alert, column) for column in ALERT_COLUMNS}
+        partition = _partition_dir(archive_dir, "fraud_alerts", timestamps.get(alert.transaction_id))
+        alert_parts.setdefault(partition, []).append(row)
+
+    for partition, rows in transaction_parts.items():
+        _write_parquet(rows, transactions_schema, os.path.join(partition, f"part-{rows[0]['id']}-{rows[-1]['id']}.parquet"))
+    for partition, rows in alert_parts.items():
+        rows.sort(key=lambda r: r["id"])
+        _write_parquet(rows, alerts_schema, os.path.join(partition, f"part-{rows[0]['id']}-{rows[-1]['id']}.parquet"))
+
+    # Delete alerts first to satisfy the foreign key, then the transactions
+    if alerts:
+        db.query(FraudAlert).filter(
+            FraudAlert.id.in_([a.id for a in alerts])
+        ).delete(synchronize_session=False)
+    db.query(Transaction).filter(
+        Transaction.id.in_([t.id for t in transactions])
+    ).delete(synchronize_session=False)
+
+    # Keep the running aggregates equal to the contents of the hot table
+    adjust_transaction_stats(
+        db,
+        transactions=-len(transactions),
+        frauds=-sum(1 for t in transactions if t.is_fraud),
+        amount=-sum(t.amount or 0.0 for t in transactions),
+        fraud_probability_sum=-sum(t.fraud_probability or 0.0 for t in transactions)
+    )
+
+    db.commit()
+    db.expunge_all()
+
+    for transaction_id in transaction_ids:
+        transaction_detail_cache.invalidate(transaction_id)
+    return len(transactions)
+
+def run_retention(
+    horizon_days: int = RETENTION_DAYS,
+    archive_dir: str = ARCHIVE_DIR,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    max_chunks: Optional[int] = None
+) -> int:
+    """
+    Archive every transaction and alert older than the retention horizon.
+
+    Args:
+        horizon_days: Number of days of data kept in the database
+        archive_dir: Root directory of the archive
+        chunk_size: Transactions moved per database transaction
+        max_chunks: Optional cap on chunks per run, to bound the job's duration
+
+    Returns:
+        Total number of transactions archived
+    """
+    cutoff = datetime.now() - timedelta(days=horizon_days)
+    logger.info(f"Archiving transactions older than {cutoff.isoformat()} to {archive_dir}")
+
+    total = 0
+    chunks = 0
+    db = SessionLocal()
+    try:
+        while max_chunks is None or chunks < max_chunks:
+            try:
+                moved = archive_chunk(db, cutoff, archive_dir, chunk_size)
+            except Exception:
+                db.rollback()
+                raise
+            if moved == 0:
+                break
+            total += moved
+            chunks += 1
+            logger.info(f"Archived {total} transactions so far")
+    finally:
+        db.close()
+
+    logger.info(f"Retention run completed: {total} transactions archived")
+    return total
+
+def _read_archive(
+    archive_dir: str,
+    table_name: str,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    filters: List[Any]
+) -> pd.DataFrame:
+    """
+    Read archived rows for a table, pruning files by month and row-group statistics.
+
+    Args:
+        archive_dir: Root directory of the archive
+        table_name: "transactions" or "fraud_alerts"
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        filters: Extra pyarrow.dataset expressions to apply
+
+    Returns:
+        DataFrame of archived rows (empty if the archive has none)
+    """
+    import pyarrow.dataset as pads
+
+    path = os.path.join(archive_dir, table_name)
+    if not os.path.isdir(path):
+        return pd.DataFrame()
+
+    dataset = pads.dataset(path, format="parquet", partitioning="hive")
+    expression = None
+    conditions = list(filters)
+    if start is not None:
+        conditions.append(pads.field("timestamp") >= start)
+        conditions.append(
+            (pads.field("year") > start.year)
+            | ((pads.field("year") == start.year) & (pads.field("month") >= start.month))
+        )
+    if end is not None:
+        conditions.append(pads.field("timestamp") < end)
+        conditions.append(
+            (pads.field("year") < end.year)
+            | ((pads.field("year") == end.year) & (pads.field("month") <= end.month))
+        )
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(filter=expression)
+    return table.select([c for c in table.column_names if c not in ("year", "month")]).to_pandas()
+
+def query_transactions(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    account: Optional[str] = None,
+    transaction_id: Optional[str] = None,
+    include_alerts: bool = True,
+    archive_dir: str = ARCHIVE_DIR
+) -> pd.DataFrame:
+    """
+    Read transactions from the database and the archive together.
+
+    Intended for investigations that reach past the retention horizon. Hot
+    rows and archived rows are concatenated and ordered newest first; alert
+    columns are joined on transaction_id with an "alert_" prefix.
+
+    Args:
+        db: Database session
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        account: Match name_orig or name_dest
+        transaction_id: Match a single transaction
+        include_alerts: Whether to join fraud alert columns
+        archive_dir: Root directory of the archive
+
+    Returns:
+        DataFrame of matching transactions
+    """
+    import pyarrow.dataset as pads
+
+    query = db.query(*[getattr(Transaction, column).label(column) for column in TRANSACTION_COLUMNS])
+    archive_filters = []
+    if start is not None:
+        query = query.filter(Transaction.timestamp >= start)
+    if end is not None:
+        query = query.filter(Transaction.timestamp < end)
+    if account is not None:
+        # Filter on the integer keys so the account indexes are used
+        account_id = db.query(Account.id).filter(Account.name == account).scalar()
+        query = query.filter(or_(Transaction.orig_account_id == account_id, Transaction.dest_account_id == account_id))
+        archive_filters.append((pads.field("name_orig") == account) | (pads.field("name_dest") == account))
+    if transaction_id is not None:
+        query = query.filter(Transaction.transaction_id == transaction_id)
+        archive_filters.append(pads.field("transaction_id") == transaction_id)
+
+    hot = pd.DataFrame(query.all(), columns=TRANSACTION_COLUMNS)
+    archived = _read_archive(archive_dir, "transactions", start, end, archive_filters)
+    frames = [frame for frame in (hot, archived) if not frame.empty]
+    if not frames:
+        return hot
+
+    result = pd.concat(frames, ignore_index=True)
+    result = result.drop_duplicates(subset="transaction_id", keep="first")
+
+    if include_alerts:
+        transaction_ids = result["transaction_id"].tolist()
+        alert_rows = []
+        for i in range(0, len(transaction_ids), 1000):
+            batch = transaction_ids[i:i + 1000]
+            alert_rows.extend(db.query(*[getattr(FraudAlert, column) for column in ALERT_COLUMNS]).filter(
+                FraudAlert.transaction_id.in_(batch)
+            ).all())
+        hot_alerts = pd.DataFrame(alert_rows, columns=ALERT_COLUMNS)
+        archived_alerts = _read_archive(
+            archive_dir, "fraud_alerts", None, None,
+            [pads.field("transaction_id").isin(transaction_ids)]
+        )
+        alerts = pd.concat(
+            [frame for frame in (hot_alerts, archived_alerts) if not frame.empty] or [hot_alerts],
+            ignore_index=True
+        ).drop_duplicates(subset="transaction_id", keep="first")
+        alerts = alerts.add_prefix("alert_").rename(columns={"alert_transaction_id": "transaction_id"})
+        result = result.merge(alerts, on="transaction_id", how="left")
+
+    return result.sort_values(["timestamp", "id"], ascending=False).reset_index(drop=True)
+
+def main():
+    """Main function to run the retention job."""
+    parser = argparse.ArgumentParser(description='Archive old transactions and alerts to Parquet')
+    parser.add_argument('--horizon-days', type=int, default=RETENTION_DAYS, help='Days of data to keep in the database')
+    parser.add_argument('--chunk-size', type=int, default=ARCHIVE_CHUNK_SIZE, help='Transactions moved per database transaction')
+    parser.add_argument('--max-chunks', type=int, default=None, help='Stop after this many chunks')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='Directory for archived Parquet files')
+
+    args = parser.parse_args()
+
+    run_retention(
+        horizon_days=args.horizon_days,
+        archive_dir=args.archive_dir,
+        chunk_size=args.chunk_size,
+        max_chunks=args.max_chunks
+    )
+
+if __name__ == "__main__":
+    main()
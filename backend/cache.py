@@ -0,0 +1,156 @@
+"""
+cache.py - In-process caches shared by the API and database helpers.
+
+This module provides a small thread-safe LRU cache used for hot lookups on
+the request and write paths, and a short-TTL response cache with request
+coalescing for polled dashboard endpoints. Caches are per process; each
+worker keeps its own copy.
+"""
+
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from serialization import dumps
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used cache."""
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache value for key, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the entry for key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+@dataclass
+class CachedResponse:
+    """A serialized JSON response body with its validators."""
+
+    body: bytes
+    etag: str
+    last_modified: float
+    expires_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+def _retrieve_exception(task: "asyncio.Future[Any]") -> None:
+    """Mark a task's exception as retrieved when every requester has gone away."""
+    if not task.cancelled():
+        task.exception()
+
+class ResponseCache:
+    """
+    Short-TTL cache of serialized JSON responses with singleflight coalescing.
+
+    While an entry is being computed, further requests for the same key wait
+    for that computation instead of starting their own, so N concurrent
+    identical requests cost one computation. Entries keep their
+    last-modified time across refreshes that produce an identical body.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a computed response is served before recomputing
+            max_size: Maximum number of cached keys
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(max_size)
+        self._inflight: Dict[Hashable, "asyncio.Task[CachedResponse]"] = {}
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+    ) -> CachedResponse:
+        """
+        Return a fresh cached response for key, computing it at most once at a time.
+
+        Args:
+            key: Cache key
+            compute: Coroutine factory returning (JSON-serializable payload or RawJSON, extra headers);
+                     it must not depend on the requesting request's state (e.g. its session),
+                     as other requests share its result
+
+        Returns:
+            CachedResponse for key
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            return entry
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            # The computation is its own task, so a cancelled (disconnected) first
+            # requester neither cancels it nor fails the requests waiting on it
+            inflight = asyncio.ensure_future(self._compute(key, entry, compute))
+            inflight.add_done_callback(_retrieve_exception)
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _compute(
+        self,
+        key: Hashable,
+        previous: Optional[CachedResponse],
+        compute: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+    ) -> CachedResponse:
+        """Compute, serialize and store the response for key."""
+        try:
+            payload, headers = await compute()
+            body = dumps(payload)
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            now = time.time()
+            last_modified = previous.last_modified if previous is not None and previous.etag == etag else now
+            entry = CachedResponse(body, etag, last_modified, now + self.ttl_seconds, headers)
+            if self.ttl_seconds > 0:
+                self._entries.put(key, entry)
+            return entry
+        finally:
+            del self._inflight[key]
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
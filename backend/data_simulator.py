@@ -16,6 +16,7 @@ from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 import argparse
 from db_utils import read_fraud_data
+from snapshot import FraudDataSnapshot
 
 # Configure logging
 logging.basicConfig(
@@ -35,7 +36,10 @@ class TransactionSimulator:
         batch_size: int = 100,
         delay_seconds: float = 0.5,
         api_url: Optional[str] = None,
-        sample_size: Optional[float] = None
+        sample_size: Optional[float] = None,
+        sampling_method: str = "hash",
+        stratified_sampling: bool = False,
+        use_snapshot: bool = False
     ):
         """
         Initialize the transaction simulator.
@@ -45,17 +49,36 @@ class TransactionSimulator:
             delay_seconds: Delay between batches in seconds
             api_url: URL of the prediction API (if None, processes data only)
             sample_size: If provided, use only this fraction of data (0.0-1.0)
+            sampling_method: How sample_size is drawn: "random", "hash" or "block"
+            stratified_sampling: If True, keep every fraud row and sample only legitimate ones
+            use_snapshot: If True, load from the local snapshot (refreshed with new rows first)
         """
         self.batch_size = batch_size
         self.delay_seconds = delay_seconds
         self.api_url = api_url
         self.sample_size = sample_size
+        self.sampling_method = sampling_method
+        self.stratified_sampling = stratified_sampling
+        self.use_snapshot = use_snapshot
 
     def load_data(self) -> pd.DataFrame:
-        """Load transaction data from database."""
+        """Load transaction data from database, or from the local snapshot if enabled."""
         try:
+            if self.use_snapshot:
+                logger.info("Loading data from local snapshot")
+                return FraudDataSnapshot().load(
+                    sample_size=self.sample_size,
+                    sampling_method=self.sampling_method,
+                    stratified=self.stratified_sampling,
+                    raw=True
+                )
+
             logger.info("Loading data from database")
-            return read_fraud_data(sample_size=self.sample_size)
+            return read_fraud_data(
+                sample_size=self.sample_size,
+                sampling_method=self.sampling_method,
+                stratified=self.stratified_sampling
+            )
         except Exception as e:
             logger.error(f"Failed to load data from database: {e}")
             raise
@@ -227,6 +250,12 @@ def main():
                         help='API URL (e.g., http://localhost:8002/predict)')
     parser.add_argument('--sample-size', type=float, default=None, 
                         help='Fraction of data to use (0.0-1.0, e.g., 0.01 for 1% of data)')
+    parser.add_argument('--sampling-method', default='hash', choices=['random', 'hash', 'block'],
+                        help='How the sample is drawn (default: hash)')
+    parser.add_argument('--stratified-sampling', action='store_true',
+                        help='Keep every fraud transaction when sampling')
+    parser.add_argument('--use-snapshot', action='store_true',
+                        help='Load from the local snapshot instead of querying the database')
 
     args = parser.parse_args()
 
@@ -235,7 +264,10 @@ def main():
         batch_size=args.batch_size,
         delay_seconds=args.delay,
         api_url=args.api,
-        sample_size=args.sample_size
+        sample_size=args.sample_size,
+        sampling_method=args.sampling_method,
+        stratified_sampling=args.stratified_sampling,
+        use_snapshot=args.use_snapshot
     )
 
     # Warn if processing full dataset without limits
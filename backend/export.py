@@ -0,0 +1,318 @@
+"""
+export.py - Streaming bulk export of transactions and fraud alerts.
+
+Rows are read through a server-side cursor (`stream_results` / `yield_per`)
+as plain tuples and encoded batch by batch as CSV, NDJSON, columnar NDJSON
+(one object of column arrays per batch), an Arrow IPC stream or Parquet, so
+memory use stays flat no matter how many rows are exported. The same
+generators back the `/export/*` API endpoints and the command line.
+
+Usage:
+    python export.py {transactions,alerts} [--format FORMAT] [--start ISO] [--end ISO]
+                     [--transaction-type TYPE] [--output PATH]
+"""
+
+import io
+import csv
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session, aliased
+
+from db_models import Account, Transaction, FraudAlert, SessionLocal
+from archive import TRANSACTION_COLUMNS, ALERT_COLUMNS, arrow_schemas
+from serialization import encode_columns
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the server-side cursor and encoded per batch
+EXPORT_BATCH_SIZE = 10000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_TABLES = ("transactions", "alerts")
+
+def build_export_query(
+    db: Session,
+    table: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    transaction_type: Optional[str] = None
+) -> Tuple[Any, List[str]]:
+    """
+    Build the column query for an export.
+
+    Args:
+        db: Database session
+        table: "transactions" or "alerts"
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        transaction_type: Optional transaction type filter
+
+    Returns:
+        Tuple of (query, column names)
+    """
+    if table == "transactions":
+        orig_account = aliased(Account)
+        dest_account = aliased(Account)
+        selected = {
+            column: getattr(Transaction, column) for column in TRANSACTION_COLUMNS
+            if column not in ("name_orig", "name_dest")
+        }
+        selected["name_orig"] = orig_account.name
+        selected["name_dest"] = dest_account.name
+        query = db.query(*[selected[column].label(column) for column in TRANSACTION_COLUMNS]).join(
+            orig_account, orig_account.id == Transaction.orig_account_id
+        ).join(
+            dest_account, dest_account.id == Transaction.dest_account_id
+        )
+        timestamp_column = Transaction.timestamp
+        columns = TRANSACTION_COLUMNS
+    elif table == "alerts":
+        query = db.query(*[getattr(FraudAlert, column).label(column) for column in ALERT_COLUMNS])
+        if transaction_type:
+            query = query.join(Transaction, Transaction.transaction_id == FraudAlert.transaction_id)
+        timestamp_column = FraudAlert.timestamp
+        columns = ALERT_COLUMNS
+    else:
+        raise ValueError(f"Table must be one of {EXPORT_TABLES}")
+
+    if start is not None:
+        query = query.filter(timestamp_column >= start)
+    if end is not None:
+        query = query.filter(timestamp_column < end)
+    if transaction_type:
+        query = query.filter(Transaction.transaction_type == transaction_type)
+
+    return query.order_by(timestamp_column), columns
+
+def iter_row_batches(query, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Sequence[Any]]]:
+    """
+    Iterate over a query in batches through a server-side cursor.
+
+    Args:
+        query: Column query
+        batch_size: Rows per batch
+
+    Yields:
+        Lists of row tuples
+    """
+    batch = []
+    for row in query.yield_per(batch_size):
+        batch.append(tuple(row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _json_default(value: Any) -> Any:
+    """Serialize datetimes for NDJSON output."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_csv(batches: Iterator[List[Sequence[Any]]], columns: List[str]) -> Iterator[bytes]:
+    """Encode row batches as CSV with a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def encode_ndjson(batches: Iterator[List[Sequence[Any]]], columns: List[str]) -> Iterator[bytes]:
+    """Encode row batches as newline-delimited JSON objects."""
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in batch
+        ).encode("utf-8")
+
+def encode_columnar(batches: Iterator[List[Sequence[Any]]], columns: List[str]) -> Iterator[bytes]:
+    """Encode each row batch as one line holding an object of column arrays."""
+    for batch in batches:
+        yield encode_columns(columns, batch) + b"\n"
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def encode_parquet(batches: Iterator[List[Sequence[Any]]], table: str) -> Iterator[bytes]:
+    """Encode row batches as a Parquet file, one row group per batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    transactions_schema, alerts_schema = arrow_schemas()
+    schema = transactions_schema if table == "transactions" else alerts_schema
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def encode_arrow_stream(batches: Iterator[List[Sequence[Any]]], table: str) -> Iterator[bytes]:
+    """Encode row batches as an Arrow IPC stream, one record batch per batch."""
+    import pyarrow as pa
+
+    transactions_schema, alerts_schema = arrow_schemas()
+    schema = transactions_schema if table == "transactions" else alerts_schema
+
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def stream_export(
+    table: str,
+    export_format: str = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    transaction_type: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    Stream an export as encoded byte chunks.
+
+    The generator owns its database session so it can outlive the request
+    handler that returned it.
+
+    Args:
+        table: "transactions" or "alerts"
+        export_format: One of EXPORT_FORMATS
+        start: Range start (inclusive)
+        end: Range end (exclusive)
+        transaction_type: Optional transaction type filter
+        batch_size: Rows per batch
+
+    Yields:
+        Encoded chunks of the export
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format must be one of {list(EXPORT_FORMATS)}")
+
+    db = SessionLocal()
+    try:
+        query, columns = build_export_query(db, table, start, end, transaction_type)
+        batches = iter_row_batches(query, batch_size)
+        if export_format == "csv":
+            yield from encode_csv(batches, columns)
+        elif export_format == "ndjson":
+            yield from encode_ndjson(batches, columns)
+        elif export_format == "columnar":
+            yield from encode_columnar(batches, columns)
+        elif export_format == "arrow":
+            yield from encode_arrow_stream(batches, table)
+        else:
+            yield from encode_parquet(batches, table)
+    finally:
+        db.close()
+
+def main():
+    """Main function to export transactions or alerts to a file or stdout."""
+    parser = argparse.ArgumentParser(description='Export transactions or fraud alerts')
+    parser.add_argument('table', choices=EXPORT_TABLES, help='Table to export')
+    parser.add_argument('--format', default='csv', choices=list(EXPORT_FORMATS), help='Output format')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None, help='Range start (ISO 8601)')
+    parser.add_argument('--end', type=datetime.fromisoformat, default=None, help='Range end (ISO 8601)')
+    parser.add_argument('--transaction-type', default=None, help='Restrict to one transaction type')
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE, help='Rows fetched per batch')
+    parser.add_argument('--output', default=None, help='Output file (default: stdout)')
+
+    args = parser.parse_args()
+
+    chunks = stream_export(
+        args.table,
+        export_format=args.format,
+        start=args.start,
+        end=args.end,
+        transaction_type=args.transaction_type,
+        batch_size=args.batch_size
+    )
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        logger.info(f"Exported {args.table} as {args.format} ({written} bytes)")
+    finally:
+        if args.output:
+            output.close()
+
+if __name__ == "__main__":
+    main()
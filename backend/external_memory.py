@@ -0,0 +1,213 @@
+"""
+external_memory.py - Out-of-core XGBoost training over chunked reads.
+
+Rows are streamed chunk by chunk from the local snapshot (memory-mapped) or
+from the database (server-side cursor) in db_utils' compact dtypes. Each
+chunk is split into train / validation / test rows by a hash of its primary
+key, so the split is stable across runs and passes without holding the
+table in memory. Training rows go to XGBoost through a DataIter, which
+writes them to an on-disk page cache. Validation rows for early stopping
+are reservoir-sampled to a fixed size, and test rows are scored in a
+further streaming pass, so memory stays bounded as the table grows. Rows added after a key watermark
+are read the same way, unsampled, for incremental model updates.
+"""
+
+import os
+import shutil
+import logging
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sqlalchemy import text
+
+from db_utils import (
+    get_db_engine, get_sampling_key, build_fraud_data_queries, coerce_compact_chunk, compact_frame,
+    COMPACT_SELECT, FRAUD_DATA_TABLE, HASH_RANGE, LOAD_CHUNK_SIZE
+)
+from snapshot import FraudDataSnapshot
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Directory for XGBoost's external-memory page cache
+EXTERNAL_CACHE_DIR = os.getenv(
+    "EXTERNAL_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "xgb_cache")
+)
+
+# Multiplier of the split hash; differs from db_utils.HASH_MULTIPLIER so the
+# split is not a shifted copy of the hash sample
+SPLIT_MULTIPLIER = 2246822519
+
+# Bucket codes returned by split_buckets
+TRAIN_BUCKET, VALIDATION_BUCKET, TEST_BUCKET = 0, 1, 2
+
+def iter_compact_chunks(
+    sample_size: Optional[float] = None,
+    random_state: int = 42,
+    sampling_method: str = "hash",
+    stratified: bool = False,
+    use_snapshot: bool = False,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    min_key: Optional[int] = None
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Yield the requested rows as compact frames, chunk by chunk.
+
+    Args:
+        sample_size: If provided, only a fraction of the data is read
+        random_state: Random state for reproducibility when sampling
+        sampling_method: "random", "hash" or "block"
+        stratified: If True, keep every isFraud=1 row and sample only the rest
+        use_snapshot: Read the memory-mapped local snapshot instead of the database
+        chunk_size: Rows per chunk
+        min_key: If provided, read every row with a greater primary key instead of sampling
+
+    Yields:
+        Tuples of (compact frame, int64 primary keys)
+    """
+    if use_snapshot:
+        snapshot = FraudDataSnapshot()
+        snapshot.refresh()
+        columns = snapshot.columns()
+        if min_key is not None:
+            # Snapshot rows are appended in key order
+            index = np.arange(np.searchsorted(columns["key"], min_key, side="right"), len(columns["key"]))
+        else:
+            index = snapshot.sample_index(columns, sample_size, random_state, sampling_method, stratified)
+        total = len(columns["key"]) if index is None else len(index)
+        for start in range(0, total, chunk_size):
+            rows = slice(start, start + chunk_size) if index is None else index[start:start + chunk_size]
+            arrays = {
+                column: np.asarray(values[rows])
+                for column, values in columns.items() if column not in ("nameOrig", "nameDest")
+            }
+            yield compact_frame(arrays), arrays["key"]
+        return
+
+    engine = get_db_engine()
+    key = engine.dialect.identifier_preparer.quote(get_sampling_key(engine))
+    if min_key is not None:
+        queries = [(
+            text(f"SELECT {COMPACT_SELECT}, {key} AS row_key FROM {FRAUD_DATA_TABLE} WHERE {key} > :min_key ORDER BY {key}"),
+            {"min_key": min_key}
+        )]
+    else:
+        queries = build_fraud_data_queries(
+            engine, sample_size, random_state, sampling_method, stratified,
+            columns=f"{COMPACT_SELECT}, {key} AS row_key"
+        )
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+        for query, params in queries:
+            for chunk in pd.read_sql(query, conn, params=params, chunksize=chunk_size):
+                yield compact_frame(coerce_compact_chunk(chunk)), chunk["row_key"].to_numpy(dtype=np.int64)
+
+def split_buckets(keys: np.ndarray, test_size: float, validation_size: float, random_state: int = 42) -> np.ndarray:
+    """
+    Assign rows to train, validation or test by a hash of their primary key.
+
+    Args:
+        keys: Primary keys
+        test_size: Fraction of rows held out for evaluation
+        validation_size: Fraction of rows held out for early stopping
+        random_state: Salt of the hash
+
+    Returns:
+        int8 array of TRAIN_BUCKET, VALIDATION_BUCKET or TEST_BUCKET
+    """
+    salt = np.uint64(((random_state + 1) * 69069) % HASH_RANGE)
+    hashed = (keys.astype(np.uint64) * np.uint64(SPLIT_MULTIPLIER) + salt) % np.uint64(HASH_RANGE)
+    buckets = np.full(len(keys), TRAIN_BUCKET, dtype=np.int8)
+    buckets[hashed < np.uint64(int((test_size + validation_size) * HASH_RANGE))] = VALIDATION_BUCKET
+    buckets[hashed < np.uint64(int(test_size * HASH_RANGE))] = TEST_BUCKET
+    return buckets
+
+class ReservoirSample:
+    """Uniform fixed-size sample of (features, label) rows seen across chunks (algorithm R)."""
+
+    def __init__(self, capacity: int, random_state: int = 42):
+        """
+        Initialize the sample.
+
+        Args:
+            capacity: Maximum number of rows kept
+            random_state: Random seed
+        """
+        self.capacity = capacity
+        self.seen = 0
+        self._rng = np.random.default_rng(random_state)
+        self._X: Optional[np.ndarray] = None
+        self._y: Optional[np.ndarray] = None
+
+    def add(self, X: np.ndarray, y: np.ndarray) -> None:
+        """Offer a chunk of rows to the sample."""
+        if len(y) == 0:
+            return
+        if self._X is None:
+            self._X = np.empty((self.capacity, X.shape[1]), dtype=X.dtype)
+            self._y = np.empty(self.capacity, dtype=y.dtype)
+
+        # Fill the free slots first
+        free = min(self.capacity - min(self.seen, self.capacity), len(y))
+        if free:
+            self._X[self.seen:self.seen + free] = X[:free]
+            self._y[self.seen:self.seen + free] = y[:free]
+
+        # Row number t (0-based) then replaces a random slot with probability capacity / (t + 1)
+        positions = self.seen + np.arange(free, len(y))
+        slots = (self._rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+        keep = slots < self.capacity
+        self._X[slots[keep]] = X[free:][keep]
+        self._y[slots[keep]] = y[free:][keep]
+        self.seen += len(y)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the sampled (X, y)."""
+        if self._X is None:
+            return np.empty((0, 0), dtype=np.float32), np.empty(0)
+        rows = min(self.seen, self.capacity)
+        return self._X[:rows], self._y[:rows]
+
+class ChunkedDataIter(xgb.DataIter):
+    """DataIter over (features, labels) chunks from a restartable generator factory."""
+
+    def __init__(self, chunks: Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]], cache_prefix: str):
+        """
+        Initialize the iterator.
+
+        Args:
+            chunks: Called at the start of every pass; returns an iterator of (X, y) chunks
+            cache_prefix: Path prefix of XGBoost's on-disk page cache
+        """
+        self._chunks = chunks
+        self._iterator = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data: Callable) -> int:
+        if self._iterator is None:
+            self._iterator = self._chunks()
+        for X, y in self._iterator:
+            if len(y):
+                input_data(data=X, label=y)
+                return 1
+        return 0
+
+    def reset(self) -> None:
+        self._iterator = None
+
+def make_cache_prefix(cache_dir: str = EXTERNAL_CACHE_DIR) -> str:
+    """Create a per-process cache directory and return the page cache prefix inside it."""
+    run_dir = os.path.join(cache_dir, f"run-{os.getpid()}")
+    os.makedirs(run_dir, exist_ok=True)
+    return os.path.join(run_dir, "train")
+
+def remove_cache(cache_prefix: str) -> None:
+    """Delete the page cache created under make_cache_prefix."""
+    shutil.rmtree(os.path.dirname(cache_prefix), ignore_errors=True)
@@ -6,33 +6,83 @@ for fraud detection in financial transactions. It includes data preprocessing,
 feature engineering, model training, evaluation, and persistence.
 
 Memory Optimization Features:
-- Data sampling: Option to use only a fraction of the data for training
-- Data type optimization: Option to use float32 instead of float64 to reduce memory usage
+- Data sampling: Option to use only a fraction of the data for training, by
+  hash-of-key, key-block or ORDER BY RAND sampling, optionally keeping every fraud row
+- Data type optimization: Option to use float32 instead of float64 to reduce memory usage;
+  with it, data is streamed in chunks straight into compact dtypes (see db_utils.load_fraud_data_compact)
+- Local snapshot: Option to memory-map a locally cached, incrementally refreshed copy of the
+  table instead of querying the database on every run (see snapshot.py)
+- Single-pass features: Derived features are computed with NumPy into one preallocated
+  float32 block and one int8 block, without copying the input frame (--benchmark-features
+  reports peak RSS against the previous copy-per-step version)
+- Stage caching: Option to reuse the split, preprocessed and resampled arrays of an earlier
+  run with the same data and settings, memory-mapped from disk (see stage_cache.py)
+- Successive-halving search: Hyperparameters are searched by successive halving or Hyperband
+  over rows and boosting rounds within an optional time budget, warm-started from earlier
+  searches, instead of an exhaustive grid search (see hyperparam_search.py)
+- Cheaper imbalance handling: Instead of full SMOTE, the training set can be rebalanced by
+  negative downsampling with weight correction, by scale_pos_weight alone, or by SMOTE
+  restricted to a neighborhood sample (--benchmark-imbalance compares time, peak RSS and AUC)
 - Reduced parameter grid: Smaller hyperparameter search space when memory_efficient=True
-- Memory-efficient training: Uses 'hist' tree method and single-threaded processing
+- Memory-efficient training: Uses 'hist' tree method
+- Resource-aware parallelism: Parallel trials and threads per trial are chosen from the
+  available cores and memory and the data shape (see scheduler.py)
+- External-memory training: Option to stream the full dataset through an XGBoost DataIter,
+  preprocessing each chunk, with an on-disk page cache instead of an in-memory matrix
+  (see external_memory.py)
+- Incremental updates: Option to update the saved model from only the rows added since it
+  was trained (its key watermark), by continued boosting or by refreshing leaf values,
+  promoted only if it does not regress on held-out new rows
 - Fallback mechanisms: Gracefully handles memory errors by falling back to simpler models
 - Progressive sampling: Automatically reduces sample size if memory errors persist
 
 Usage:
-    python fraud_model.py [--sample-size SAMPLE_SIZE] [--use-float32] [--memory-efficient] [--full-data]
+    python fraud_model.py [--sample-size SAMPLE_SIZE] [--sampling-method {random,hash,block}]
+                          [--stratified-sampling] [--use-float32] [--memory-efficient] [--full-data]
+                          [--use-snapshot] [--stage-cache] [--search {grid,halving,hyperband}]
+                          [--time-budget SECONDS] [--no-search-history] [--benchmark-features]
+                          [--external-memory] [--chunk-size ROWS] [--max-parallel-trials N]
+                          [--benchmark-search] [--imbalance-strategy {smote,smote_sample,downsample,weight}]
+                          [--benchmark-imbalance] [--incremental [{continue,refresh}]]
 """
 
 import os
+import sys
+import json
+import time
 import pickle
 import random
+import resource
+import multiprocessing
 import numpy as np
 import pandas as pd
 import xgboost as xgb
 from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, precision_recall_curve, auc, f1_score, precision_score, recall_score
+from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, precision_recall_curve, auc, f1_score, precision_score, recall_score, log_loss
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
+from sklearn.neighbors import NearestNeighbors
 import lime
 import lime.lime_tabular
 import logging
+from datetime import datetime
 from typing import Tuple, Dict, Any, List, Optional
-from db_utils import read_fraud_data
+from db_utils import (
+    read_fraud_data, load_fraud_data_compact, get_db_engine, fraud_data_version, fraud_data_max_key,
+    SAMPLING_METHODS, COMPACT_CATEGORIES, LOAD_CHUNK_SIZE
+)
+from snapshot import FraudDataSnapshot
+from stage_cache import StageCache, stage_key, STAGE_CACHE_DIR
+from hyperparam_search import (
+    SuccessiveHalvingSearch, DeadlineCallback, native_params, booster_to_classifier,
+    SEARCH_METHODS, SEARCH_HISTORY_PATH
+)
+from scheduler import plan_training
+from external_memory import (
+    iter_compact_chunks, split_buckets, ChunkedDataIter, ReservoirSample, make_cache_prefix, remove_cache,
+    TRAIN_BUCKET, VALIDATION_BUCKET, TEST_BUCKET
+)
 from imblearn.over_sampling import SMOTE
 
 # Configure logging
@@ -42,6 +92,193 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump when load, feature engineering or preprocessing changes, to invalidate cached stages
+FEATURE_PIPELINE_VERSION = 1
+
+# Share of rows held out for early stopping in external-memory training
+EXTERNAL_VALIDATION_SIZE = 0.1
+
+# Boosting rounds the refit after a search always trains, even past the time budget
+MIN_REFIT_ROUNDS = 30
+
+# Validation rows kept (reservoir-sampled) for early stopping in external-memory training
+EXTERNAL_MAX_VALIDATION_ROWS = 200000
+
+# Test rows kept in memory as background data for LIME in external-memory training
+EXTERNAL_LIME_ROWS = 100
+
+# Boosting rounds of external-memory training (no search is run)
+EXTERNAL_MAX_ROUNDS = 300
+
+# Tree settings used without a search: external-memory training, or a search that ran out of time
+DEFAULT_TREE_PARAMS = {'max_depth': 5, 'learning_rate': 0.1, 'subsample': 0.8, 'colsample_bytree': 0.8}
+
+# Directory the trained model, preprocessor and model state are always saved to and loaded from
+SAVED_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+# Training state saved next to the model: key watermark, training mode and rounds
+MODEL_STATE_FILE = "model_state.json"
+
+# Incremental updates: continue boosting from the saved booster, or refresh its leaf values
+INCREMENTAL_MODES = ("continue", "refresh")
+
+# Boosting rounds added at most by a "continue" update (early stopping on new validation rows)
+INCREMENTAL_ROUNDS = 50
+
+# Fraud rows needed among the held-out new rows before an update can be checked and promoted
+INCREMENTAL_MIN_HOLDOUT_POSITIVES = 10
+
+# Largest drop in held-out ROC AUC or PR AUC an update may have and still be promoted
+INCREMENTAL_TOLERANCE = 0.005
+
+# Largest relative rise in held-out log loss an update may have and still be promoted
+INCREMENTAL_LOG_LOSS_TOLERANCE = 0.05
+
+# Largest rise in the held-out alert rate (share of rows at or above ALERT_THRESHOLD)
+INCREMENTAL_ALERT_RATE_TOLERANCE = 0.001
+
+# Fraud probability at which the API flags a transaction and raises an alert (predict.py)
+ALERT_THRESHOLD = 0.5
+
+# Class-imbalance handling: full SMOTE, SMOTE over a neighborhood sample,
+# negative downsampling with weight correction, or scale_pos_weight only
+IMBALANCE_STRATEGIES = ("smote", "smote_sample", "downsample", "weight")
+
+# Legitimate rows kept per fraud row by negative downsampling
+DOWNSAMPLE_NEGATIVE_RATIO = 20
+
+# Fraud rows per legitimate row after neighborhood SMOTE, fraud rows the
+# neighbor search is fitted on, and neighbors interpolated towards
+SMOTE_SAMPLE_RATIO = 0.1
+SMOTE_NEIGHBOR_SAMPLE = 10000
+SMOTE_NEIGHBORS = 5
+
+# Derived features stored as float32 and as int8 flags, in output column order
+ENGINEERED_FLOAT_FEATURES = ['transactionRatio', 'origBalanceDiff', 'destBalanceDiff']
+ENGINEERED_FLAG_FEATURES = [
+    'origOldBalanceIsZero', 'origNewBalanceIsZero', 'destOldBalanceIsZero', 'destNewBalanceIsZero',
+    'origBalanceDiffEqualsAmount', 'destBalanceDiffEqualsAmount'
+]
+
+def build_engineered_features(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute every derived feature in one pass into two preallocated blocks.
+
+    Ratios and balance differences are written into one column-major float32
+    block and the zero / balance-matches-amount flags into one int8 block,
+    using ufunc out= arguments and a single scratch column instead of a
+    temporary Series per expression. Both blocks back the returned frame
+    without being copied.
+
+    Args:
+        X: Features frame with amount and the four balance columns
+
+    Returns:
+        DataFrame of ENGINEERED_FLOAT_FEATURES followed by ENGINEERED_FLAG_FEATURES
+    """
+    amount = X['amount'].to_numpy()
+    old_orig = X['oldbalanceOrg'].to_numpy()
+    new_orig = X['newbalanceOrig'].to_numpy()
+    old_dest = X['oldbalanceDest'].to_numpy()
+    new_dest = X['newbalanceDest'].to_numpy()
+
+    rows = len(X)
+    floats = np.empty((rows, len(ENGINEERED_FLOAT_FEATURES)), dtype=np.float32, order='F')
+    flags = np.empty((rows, len(ENGINEERED_FLAG_FEATURES)), dtype=np.int8, order='F')
+    # Differences are compared with amount at the input precision, as before
+    scratch = np.empty(rows, dtype=np.result_type(amount, old_orig, new_orig, old_dest, new_dest, np.float32))
+
+    np.add(old_orig, 1, out=scratch)
+    np.divide(amount, scratch, out=floats[:, 0])
+
+    np.subtract(old_orig, new_orig, out=scratch)
+    floats[:, 1] = scratch
+    np.subtract(scratch, amount, out=scratch)
+    np.less(np.abs(scratch, out=scratch), 0.01, out=flags[:, 4])
+
+    np.subtract(new_dest, old_dest, out=scratch)
+    floats[:, 2] = scratch
+    np.subtract(scratch, amount, out=scratch)
+    np.less(np.abs(scratch, out=scratch), 0.01, out=flags[:, 5])
+
+    for index, values in enumerate((old_orig, new_orig, old_dest, new_dest)):
+        np.equal(values, 0, out=flags[:, index])
+
+    return pd.concat([
+        pd.DataFrame(floats, columns=ENGINEERED_FLOAT_FEATURES, index=X.index, copy=False),
+        pd.DataFrame(flags, columns=ENGINEERED_FLAG_FEATURES, index=X.index, copy=False)
+    ], axis=1, copy=False)
+
+def _engineer_features_with_copies(df: pd.DataFrame) -> pd.DataFrame:
+    """The previous copy-per-step feature engineering, kept as the benchmark baseline."""
+    X = df.copy().drop(['isFraud', 'isFlaggedFraud'], axis=1).copy()
+    if 'originAccountType' not in X:
+        X['originAccountType'] = X['nameOrig'].str[0]
+        X['destAccountType'] = X['nameDest'].str[0]
+    X['transactionRatio'] = X['amount'] / (X['oldbalanceOrg'] + 1)
+    X['origOldBalanceIsZero'] = (X['oldbalanceOrg'] == 0).astype(int)
+    X['origNewBalanceIsZero'] = (X['newbalanceOrig'] == 0).astype(int)
+    X['destOldBalanceIsZero'] = (X['oldbalanceDest'] == 0).astype(int)
+    X['destNewBalanceIsZero'] = (X['newbalanceDest'] == 0).astype(int)
+    X['origBalanceDiff'] = X['oldbalanceOrg'] - X['newbalanceOrig']
+    X['destBalanceDiff'] = X['newbalanceDest'] - X['oldbalanceDest']
+    X['origBalanceDiffEqualsAmount'] = ((X['origBalanceDiff'] - X['amount']).abs() < 0.01).astype(int)
+    X['destBalanceDiffEqualsAmount'] = ((X['destBalanceDiff'] - X['amount']).abs() < 0.01).astype(int)
+    return X.drop(['nameOrig', 'nameDest'], axis=1, errors='ignore')
+
+def neighborhood_smote(
+    X: np.ndarray,
+    y: np.ndarray,
+    ratio: float = SMOTE_SAMPLE_RATIO,
+    neighbor_sample: int = SMOTE_NEIGHBOR_SAMPLE,
+    k_neighbors: int = SMOTE_NEIGHBORS,
+    random_state: int = 42
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Oversample the minority class with SMOTE restricted to a neighborhood sample.
+
+    Synthetic fraud rows interpolate between a fraud row and one of its
+    nearest fraud neighbors, as in SMOTE, but the neighbor search is fitted
+    on at most neighbor_sample fraud rows and only enough rows are generated
+    to reach ratio fraud rows per legitimate row, so the training set grows
+    by a fraction instead of doubling.
+
+    Args:
+        X: Training features
+        y: Training target (0/1)
+        ratio: Fraud rows per legitimate row after oversampling
+        neighbor_sample: Fraud rows the neighbor search is fitted on
+        k_neighbors: Neighbors to interpolate towards
+        random_state: Random seed
+
+    Returns:
+        Tuple of (X_resampled, y_resampled), synthetic rows appended
+    """
+    X = X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+    y = np.asarray(y)
+    rng = np.random.default_rng(random_state)
+
+    positives = np.flatnonzero(y == 1)
+    synthetic = int(ratio * np.sum(y == 0)) - len(positives)
+    if synthetic <= 0 or len(positives) <= k_neighbors:
+        return X, y
+
+    if len(positives) > neighbor_sample:
+        positives = rng.choice(positives, neighbor_sample, replace=False)
+    X_positive = X[positives]
+
+    # The first neighbor of each row is the row itself
+    neighbors = NearestNeighbors(n_neighbors=k_neighbors + 1).fit(X_positive).kneighbors(X_positive, return_distance=False)[:, 1:]
+    base = rng.integers(0, len(X_positive), synthetic)
+    partner = neighbors[base, rng.integers(0, k_neighbors, synthetic)]
+    gap = rng.random((synthetic, 1), dtype=np.float32 if X.dtype == np.float32 else np.float64)
+    X_synthetic = X_positive[base] + gap * (X_positive[partner] - X_positive[base])
+
+    return (
+        np.concatenate([X, X_synthetic.astype(X.dtype, copy=False)]),
+        np.concatenate([y, np.ones(synthetic, dtype=y.dtype)])
+    )
+
 class FraudModel:
     """Class for training and evaluating a fraud detection model."""
 
@@ -52,7 +289,19 @@ class FraudModel:
         random_state: int = 42,
         sample_size: Optional[float] = None,
         use_float32: bool = True,
-        memory_efficient: bool = True
+        memory_efficient: bool = True,
+        sampling_method: str = "hash",
+        stratified_sampling: bool = False,
+        use_snapshot: bool = False,
+        use_stage_cache: bool = False,
+        stage_cache_dir: str = STAGE_CACHE_DIR,
+        search_method: str = "halving",
+        time_budget: Optional[float] = None,
+        search_history_path: Optional[str] = SEARCH_HISTORY_PATH,
+        external_memory: bool = False,
+        chunk_size: int = LOAD_CHUNK_SIZE,
+        max_parallel_trials: Optional[int] = None,
+        imbalance_strategy: str = "smote"
     ):
         """
         Initialize the fraud model.
@@ -64,13 +313,41 @@ class FraudModel:
             sample_size: If provided, use only this fraction of data for training (0.0-1.0)
             use_float32: If True, use float32 instead of float64 to reduce memory usage
             memory_efficient: If True, use memory-efficient approaches for training
+            sampling_method: How sample_size is drawn: "random", "hash" or "block"
+            stratified_sampling: If True, keep every fraud row and sample only legitimate ones
+            use_snapshot: If True, load from the local snapshot (refreshed with new rows first)
+            use_stage_cache: If True, reuse cached preprocessing and resampling outputs
+            stage_cache_dir: Directory of the stage cache
+            search_method: Hyperparameter search: "grid", "halving" or "hyperband"
+            time_budget: Seconds allowed for search and refit (halving and hyperband only)
+            search_history_path: Trial history used to warm-start searches (None disables)
+            external_memory: If True, train out of core on the full (sampled) data in chunks
+            chunk_size: Rows read and preprocessed per chunk in external-memory training
+            max_parallel_trials: Cap on concurrently trained search trials (None: as resources allow)
+            imbalance_strategy: "smote", "smote_sample", "downsample" or "weight" (see IMBALANCE_STRATEGIES)
         """
+        if search_method not in SEARCH_METHODS:
+            raise ValueError(f"Search method must be one of {SEARCH_METHODS}")
+        if imbalance_strategy not in IMBALANCE_STRATEGIES:
+            raise ValueError(f"Imbalance strategy must be one of {IMBALANCE_STRATEGIES}")
+
         self.model_dir = model_dir
         self.test_size = test_size
         self.random_state = random_state
         self.sample_size = sample_size
         self.use_float32 = use_float32
         self.memory_efficient = memory_efficient
+        self.sampling_method = sampling_method
+        self.stratified_sampling = stratified_sampling
+        self.use_snapshot = use_snapshot
+        self.stage_cache = StageCache(stage_cache_dir) if use_stage_cache else None
+        self.search_method = search_method
+        self.time_budget = time_budget
+        self.search_history_path = search_history_path
+        self.external_memory = external_memory
+        self.chunk_size = chunk_size
+        self.max_parallel_trials = max_parallel_trials
+        self.imbalance_strategy = imbalance_strategy
 
         # Create model directory if it doesn't exist
         os.makedirs(model_dir, exist_ok=True)
@@ -84,23 +361,42 @@ class FraudModel:
         """
         Load the dataset from the database.
         If sample_size is provided, only a fraction of the data is loaded.
+        With use_float32, rows are streamed in chunks into compact dtypes and the
+        account name strings are replaced by their account-type codes.
+        With use_snapshot, the same compact columns are memory-mapped from the
+        local snapshot after pulling any rows added since its last refresh.
 
         Returns:
             DataFrame containing the transaction data
         """
         try:
-            logger.info("Loading data from database")
+            if self.use_snapshot:
+                logger.info("Loading data from local snapshot")
+                return FraudDataSnapshot().load(
+                    sample_size=self.sample_size,
+                    random_state=self.random_state,
+                    sampling_method=self.sampling_method,
+                    stratified=self.stratified_sampling
+                )
 
-            # Use the read_fraud_data function from db_utils.py
-            df = read_fraud_data(sample_size=self.sample_size, random_state=self.random_state)
+            logger.info("Loading data from database")
 
-            # Convert float64 columns to float32 if use_float32 is True
             if self.use_float32:
-                for col in df.select_dtypes(include=['float64']).columns:
-                    df[col] = df[col].astype('float32')
-                logger.info("Converted float64 columns to float32 to reduce memory usage")
+                # Stream chunks straight into float32 / categorical columns
+                return load_fraud_data_compact(
+                    sample_size=self.sample_size,
+                    random_state=self.random_state,
+                    sampling_method=self.sampling_method,
+                    stratified=self.stratified_sampling
+                )
 
-            return df
+            # Use the read_fraud_data function from db_utils.py
+            return read_fraud_data(
+                sample_size=self.sample_size,
+                random_state=self.random_state,
+                sampling_method=self.sampling_method,
+                stratified=self.stratified_sampling
+            )
         except Exception as e:
             logger.error(f"Failed to load data: {e}")
             raise
@@ -109,6 +405,9 @@ class FraudModel:
         """
         Preprocess the data for model training.
 
+        The label columns are removed from df in place rather than copying the
+        frame, so df itself becomes the features frame.
+
         Args:
             df: Raw transaction data
 
@@ -117,21 +416,22 @@ class FraudModel:
         """
         logger.info("Preprocessing data")
 
-        # Make a copy to avoid modifying the original
-        data = df.copy()
-
         # Extract target variable
-        y = data['isFraud']
+        y = df.pop('isFraud')
 
         # Drop unnecessary columns
-        X = data.drop(['isFraud', 'isFlaggedFraud'], axis=1)
+        del df['isFlaggedFraud']
 
-        return X, y
+        return df, y
 
     def engineer_features(self, X: pd.DataFrame) -> pd.DataFrame:
         """
         Perform feature engineering on the dataset.
 
+        Account-name columns of X are replaced in place by their account types;
+        the derived features are computed by build_engineered_features and
+        joined without copying the existing columns.
+
         Args:
             X: Features DataFrame
 
@@ -140,44 +440,26 @@ class FraudModel:
         """
         logger.info("Engineering features")
 
-        # Create a copy to avoid modifying the original
-        X_engineered = X.copy()
-
-        # Extract account type from nameOrig and nameDest
-        X_engineered['originAccountType'] = X_engineered['nameOrig'].str[0]
-        X_engineered['destAccountType'] = X_engineered['nameDest'].str[0]
-
-        # Calculate transaction-related features
-        X_engineered['transactionRatio'] = X_engineered['amount'] / (X_engineered['oldbalanceOrg'] + 1)
-        X_engineered['origOldBalanceIsZero'] = (X_engineered['oldbalanceOrg'] == 0).astype(int)
-        X_engineered['origNewBalanceIsZero'] = (X_engineered['newbalanceOrig'] == 0).astype(int)
-        X_engineered['destOldBalanceIsZero'] = (X_engineered['oldbalanceDest'] == 0).astype(int)
-        X_engineered['destNewBalanceIsZero'] = (X_engineered['newbalanceDest'] == 0).astype(int)
-
-        # Calculate balance difference
-        X_engineered['origBalanceDiff'] = X_engineered['oldbalanceOrg'] - X_engineered['newbalanceOrig']
-        X_engineered['destBalanceDiff'] = X_engineered['newbalanceDest'] - X_engineered['oldbalanceDest']
-
-        # Check if balance difference matches amount
-        X_engineered['origBalanceDiffEqualsAmount'] = (
-            (X_engineered['origBalanceDiff'] - X_engineered['amount']).abs() < 0.01
-        ).astype(int)
-
-        X_engineered['destBalanceDiffEqualsAmount'] = (
-            (X_engineered['destBalanceDiff'] - X_engineered['amount']).abs() < 0.01
-        ).astype(int)
+        # Extract account type from nameOrig and nameDest (the compact loader already provides it)
+        if 'originAccountType' not in X:
+            X['originAccountType'] = X['nameOrig'].str[0]
+            X['destAccountType'] = X['nameDest'].str[0]
 
         # Drop original ID columns as they're not useful for prediction
-        X_engineered = X_engineered.drop(['nameOrig', 'nameDest'], axis=1)
+        for column in ('nameOrig', 'nameDest'):
+            if column in X:
+                del X[column]
 
-        return X_engineered
+        return pd.concat([X, build_engineered_features(X)], axis=1, copy=False)
 
-    def create_preprocessor(self, X: pd.DataFrame) -> ColumnTransformer:
+    def create_preprocessor(self, X: pd.DataFrame, categories: Optional[Dict[str, List[str]]] = None) -> ColumnTransformer:
         """
         Create a preprocessor for the features.
 
         Args:
             X: Features DataFrame
+            categories: Known categories per categorical column; when given they
+                        are encoded even if absent from the data it is fitted on
 
         Returns:
             ColumnTransformer for preprocessing features
@@ -186,13 +468,16 @@ class FraudModel:
 
         # Identify categorical and numerical columns
         categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
-        numerical_cols = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
+        numerical_cols = X.select_dtypes(include=['number']).columns.tolist()
 
         # Create preprocessor
         preprocessor = ColumnTransformer(
             transformers=[
                 ('num', StandardScaler(), numerical_cols),
-                ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_cols)
+                ('cat', OneHotEncoder(
+                    categories=[categories[column] for column in categorical_cols] if categories else 'auto',
+                    handle_unknown='ignore'
+                ), categorical_cols)
             ]
         )
 
@@ -215,14 +500,21 @@ class FraudModel:
         logger.info("Splitting data into train and test sets")
         return train_test_split(X, y, test_size=self.test_size, random_state=self.random_state, stratify=y)
 
-    def train_model(self, X_train: np.ndarray, y_train: pd.Series, smote_applied: bool = False) -> xgb.XGBClassifier:
+    def train_model(
+        self,
+        X_train: np.ndarray,
+        y_train: pd.Series,
+        smote_applied: bool = False,
+        sample_weight: Optional[np.ndarray] = None
+    ) -> xgb.XGBClassifier:
         """
         Train the XGBoost model.
 
         Args:
             X_train: Training features
             y_train: Training target
-            smote_applied: Whether SMOTE was successfully applied to the training data
+            smote_applied: Whether SMOTE balanced the classes of the training data
+            sample_weight: Optional per-row weights (e.g. from negative downsampling)
 
         Returns:
             Trained XGBoost classifier
@@ -234,8 +526,13 @@ class FraudModel:
         if not smote_applied:
             # Calculate class imbalance ratio for scale_pos_weight
             # Count number of negative and positive samples
-            neg_count = np.sum(y_train == 0)
-            pos_count = np.sum(y_train == 1)
+            if sample_weight is None:
+                neg_count = np.sum(y_train == 0)
+                pos_count = np.sum(y_train == 1)
+            else:
+                # Weighted counts, so downsampled negatives count as the rows they stand for
+                neg_count = np.sum(sample_weight[np.asarray(y_train) == 0])
+                pos_count = np.sum(sample_weight[np.asarray(y_train) == 1])
 
             # Calculate scale_pos_weight as ratio of negative to positive samples
             scale_pos_weight_value = neg_count / pos_count if pos_count > 0 else 1.0
@@ -259,9 +556,15 @@ class FraudModel:
         model = xgb.XGBClassifier(**model_params)
 
         # Create a validation set for early stopping
-        X_train_fit, X_val, y_train_fit, y_val = train_test_split(
-            X_train, y_train, test_size=0.2, random_state=self.random_state, stratify=y_train
-        )
+        w_train_fit = w_val = None
+        if sample_weight is None:
+            X_train_fit, X_val, y_train_fit, y_val = train_test_split(
+                X_train, y_train, test_size=0.2, random_state=self.random_state, stratify=y_train
+            )
+        else:
+            X_train_fit, X_val, y_train_fit, y_val, w_train_fit, w_val = train_test_split(
+                X_train, y_train, sample_weight, test_size=0.2, random_state=self.random_state, stratify=y_train
+            )
         logger.info(f"Training set size: {X_train_fit.shape[0]}, Validation set size: {X_val.shape[0]}")
 
         # Create evaluation set for early stopping
@@ -287,22 +590,44 @@ class FraudModel:
                 'colsample_bytree': [0.7, 0.8, 0.9]
             }
 
+        if self.search_method != 'grid':
+            try:
+                return self._search_and_refit(
+                    model_params, param_grid, X_train, y_train, X_train_fit, y_train_fit, X_val, y_val,
+                    sample_weight, w_train_fit, w_val
+                )
+            except (MemoryError, np.core._exceptions._ArrayMemoryError) as e:
+                return self._fallback_model(X_train, y_train, e, sample_weight)
+
         # Use memory-efficient approach for cross-validation if specified
         if self.memory_efficient:
             # Use StratifiedKFold with smaller number of folds
-            cv = StratifiedKFold(n_splits=2, shuffle=True, random_state=self.random_state)
-            n_jobs = 1  # Use single job to reduce memory usage
+            folds = 2
             logger.info("Using memory-efficient cross-validation settings")
         else:
-            cv = 3
-            n_jobs = -1
+            folds = 3
+        cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=self.random_state)
+
+        # Split cores between joblib workers and XGBoost threads by what fits in memory
+        candidates = int(np.prod([len(values) for values in param_grid.values()]))
+        plan = plan_training(
+            rows=X_train_fit.shape[0] * (folds - 1) // folds,
+            features=X_train_fit.shape[1],
+            trials=candidates * folds,
+            max_parallel=self.max_parallel_trials
+        )
+        model.set_params(n_jobs=plan.threads_per_trial)
 
-        # Add early_stopping_rounds to model parameters
+        # Add early_stopping_rounds to model parameters. joblib memory-maps large
+        # arrays (over max_nbytes) for its workers, so they do not each get a copy
         fit_params = {
             'early_stopping_rounds': 10,
             'eval_set': eval_set,
             'verbose': False
         }
+        if sample_weight is not None:
+            fit_params['sample_weight'] = w_train_fit
+            fit_params['sample_weight_eval_set'] = [w_val]
 
         # Use GridSearchCV for hyperparameter tuning
         grid_search = GridSearchCV(
@@ -310,7 +635,7 @@ class FraudModel:
             param_grid=param_grid,
             cv=cv,
             scoring='roc_auc',
-            n_jobs=n_jobs,
+            n_jobs=plan.parallel_trials,
             verbose=1
         )
 
@@ -322,35 +647,133 @@ class FraudModel:
             best_model = grid_search.best_estimator_
             logger.info(f"Best parameters: {grid_search.best_params_}")
 
-            # Retrain the best model on the full training set with early stopping
-            best_model.fit(X_train, y_train, early_stopping_rounds=10, eval_set=eval_set, verbose=False)
+            # Retrain the best model on the full training set with early stopping, using every core
+            best_model.set_params(n_jobs=plan.cores)
+            best_model.fit(
+                X_train, y_train, sample_weight=sample_weight,
+                early_stopping_rounds=10, eval_set=eval_set,
+                sample_weight_eval_set=None if w_val is None else [w_val],
+                verbose=False
+            )
 
             return best_model
 
         except (MemoryError, np.core._exceptions._ArrayMemoryError) as e:
-            logger.warning(f"Memory error during grid search: {e}. Falling back to default model.")
-            # If grid search fails due to memory error, fall back to a simple model with default parameters
-            simple_model = xgb.XGBClassifier(
-                objective='binary:logistic',
-                eval_metric='auc',
-                use_label_encoder=False,
-                random_state=self.random_state,
-                tree_method='hist',
-                max_depth=3,
-                n_estimators=100
+            return self._fallback_model(X_train, y_train, e, sample_weight)
+
+    def _search_and_refit(
+        self,
+        model_params: Dict[str, Any],
+        param_grid: Dict[str, List[Any]],
+        X_train: np.ndarray,
+        y_train: Any,
+        X_train_fit: np.ndarray,
+        y_train_fit: Any,
+        X_val: np.ndarray,
+        y_val: Any,
+        sample_weight: Optional[np.ndarray] = None,
+        w_train_fit: Optional[np.ndarray] = None,
+        w_val: Optional[np.ndarray] = None
+    ) -> xgb.XGBClassifier:
+        """
+        Search with successive halving / Hyperband, then refit the best configuration.
+
+        The grid's n_estimators values become the round budget: the top rung
+        trains up to max(n_estimators) rounds with early stopping. The full
+        training set is quantized once; the search matrices reuse its cuts and
+        the refit trains on it directly with the native API.
+
+        Returns:
+            Trained XGBoost classifier
+        """
+        started = time.monotonic()
+        search_space = {name: values for name, values in param_grid.items() if name != 'n_estimators'}
+        max_rounds = max(param_grid['n_estimators'])
+
+        dtrain = xgb.QuantileDMatrix(X_train, np.asarray(y_train), weight=sample_weight)
+
+        # Trials share the quantized matrices in-process; only per-trial buffers are counted per trial
+        plan = plan_training(
+            rows=X_train_fit.shape[0],
+            features=X_train_fit.shape[1],
+            trials=int(np.prod([len(values) for values in search_space.values()])),
+            max_parallel=self.max_parallel_trials,
+            shared_data=True
+        )
+
+        search = SuccessiveHalvingSearch(
+            base_params=model_params,
+            search_space=search_space,
+            max_rounds=max_rounds,
+            hyperband=self.search_method == 'hyperband',
+            time_budget=self.time_budget,
+            random_state=self.random_state,
+            history_path=self.search_history_path,
+            parallel_trials=plan.parallel_trials,
+            threads_per_trial=plan.threads_per_trial
+        )
+        try:
+            search.fit(
+                X_train_fit, y_train_fit, X_val, y_val, reference=dtrain,
+                sample_weight=w_train_fit, val_sample_weight=w_val
             )
+            logger.info(f"Best parameters: {search.best_params_} (validation ROC AUC {search.best_score_:.4f})")
+            tree_params = search.best_params_
+            validation_matrix = search.validation_matrix_
+        except TimeoutError as e:
+            logger.warning(f"{e}; refitting with the default parameters {DEFAULT_TREE_PARAMS}")
+            tree_params = DEFAULT_TREE_PARAMS
+            validation_matrix = xgb.QuantileDMatrix(X_val, np.asarray(y_val), weight=w_val, ref=dtrain)
+
+        # Retrain the best configuration on the full training set with early stopping, within the
+        # budget but for at least MIN_REFIT_ROUNDS rounds
+        deadline = started + self.time_budget if self.time_budget else None
+        best_params = {**model_params, **tree_params, 'n_jobs': plan.cores}
+        deadline_callback = DeadlineCallback(deadline, min_rounds=MIN_REFIT_ROUNDS)
+        booster = xgb.train(
+            native_params(best_params), dtrain, num_boost_round=max_rounds,
+            evals=[(validation_matrix, 'validation')],
+            early_stopping_rounds=10,
+            callbacks=[deadline_callback],
+            verbose_eval=False
+        )
+        if deadline_callback.expired:
+            logger.warning(f"Refit stopped by the time budget after {booster.num_boosted_rounds()} of up to "
+                           f"{max_rounds} rounds; the model may be undertrained (raise --time-budget)")
+
+        return booster_to_classifier(booster, {**best_params, 'n_estimators': booster.num_boosted_rounds()})
+
+    def _fallback_model(
+        self, X_train: np.ndarray, y_train: Any, error: Exception, sample_weight: Optional[np.ndarray] = None
+    ) -> xgb.XGBClassifier:
+        """Fit a default model, on a subset if needed, after a memory error during search."""
+        logger.warning(f"Memory error during hyperparameter search: {error}. Falling back to default model.")
+        logger.warning("Use external_memory=True (--external-memory) to train on the full data with bounded memory")
+        # If the search fails due to memory error, fall back to a simple model with default parameters
+        simple_model = xgb.XGBClassifier(
+            objective='binary:logistic',
+            eval_metric='auc',
+            use_label_encoder=False,
+            random_state=self.random_state,
+            tree_method='hist',
+            max_depth=3,
+            n_estimators=100
+        )
 
-            # Try to fit with a smaller subset if we still have memory issues
-            try:
-                simple_model.fit(X_train, y_train)
-            except (MemoryError, np.core._exceptions._ArrayMemoryError):
-                logger.warning("Still experiencing memory issues. Trying with a smaller subset of data.")
-                # Use only a small subset of the data if we're still having memory issues
-                sample_size = min(10000, len(X_train))
-                indices = np.random.choice(len(X_train), sample_size, replace=False)
-                simple_model.fit(X_train[indices], y_train.iloc[indices] if hasattr(y_train, 'iloc') else y_train[indices])
+        # Try to fit with a smaller subset if we still have memory issues
+        try:
+            simple_model.fit(X_train, y_train, sample_weight=sample_weight)
+        except (MemoryError, np.core._exceptions._ArrayMemoryError):
+            logger.warning("Still experiencing memory issues. Trying with a smaller subset of data.")
+            # Use only a small subset of the data if we're still having memory issues
+            sample_size = min(10000, len(X_train))
+            indices = np.random.choice(len(X_train), sample_size, replace=False)
+            simple_model.fit(
+                X_train[indices], y_train.iloc[indices] if hasattr(y_train, 'iloc') else y_train[indices],
+                sample_weight=None if sample_weight is None else sample_weight[indices]
+            )
 
-            return simple_model
+        return simple_model
 
     def evaluate_model(self, model: xgb.XGBClassifier, X_test: np.ndarray, y_test: pd.Series) -> Dict[str, Any]:
         """
@@ -367,11 +790,22 @@ class FraudModel:
         logger.info("Evaluating model")
 
         # Make probability predictions
-        y_prob = model.predict_proba(X_test)[:, 1]
+        return self.evaluate_probabilities(y_test, model.predict_proba(X_test)[:, 1])
+
+    def evaluate_probabilities(self, y_test: Any, y_prob: np.ndarray) -> Dict[str, Any]:
+        """
+        Compute the evaluation metrics from predicted fraud probabilities.
 
-        # Default threshold predictions
-        y_pred_default = model.predict(X_test)
+        Args:
+            y_test: Test target
+            y_prob: Predicted fraud probability per test row
+
+        Returns:
+            Dictionary with evaluation metrics
+        """
+        # Default threshold predictions (as XGBClassifier.predict)
         default_threshold = 0.5
+        y_pred_default = (y_prob > default_threshold).astype(int)
 
         # Calculate Precision-Recall curve and AUC
         precision_curve, recall_curve, thresholds = precision_recall_curve(y_test, y_prob)
@@ -532,13 +966,16 @@ class FraudModel:
             # Return empty explanation if anything fails
             return [], []
 
-    def save_model(self, model: xgb.XGBClassifier, preprocessor: ColumnTransformer) -> str:
+    def save_model(
+        self, model: xgb.XGBClassifier, preprocessor: ColumnTransformer, state: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Save the trained model and preprocessor.
 
         Args:
             model: Trained XGBoost model
             preprocessor: Feature preprocessor
+            state: Training state (e.g. the key watermark) saved as MODEL_STATE_FILE
 
         Returns:
             Path to the saved model
@@ -546,71 +983,515 @@ class FraudModel:
         logger.info("Saving model and preprocessor")
 
         # Always save to models directory regardless of self.model_dir
-        fixed_model_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+        fixed_model_dir = SAVED_MODEL_DIR
 
         # Create a model directory if it doesn't exist
         os.makedirs(fixed_model_dir, exist_ok=True)
 
-        # Save model to fixed path
+        # Write every file to a temporary name first, then move them into place with
+        # os.replace, the model last: a running FraudPredictionService reloads when the
+        # model file changes (see predict.MODEL_RELOAD_INTERVAL) and must find the rest ready
         model_path = os.path.join(fixed_model_dir, 'xgboost_fraud_model.pkl')
-        with open(model_path, 'wb') as f:
-            pickle.dump(model, f)
-
-        # Save preprocessor to the fixed model directory
         preprocessor_path = os.path.join(fixed_model_dir, 'preprocessor.pkl')
-        with open(preprocessor_path, 'wb') as f:
-            pickle.dump(preprocessor, f)
-
-        # Save feature names to fixed model directory
         feature_names_path = os.path.join(fixed_model_dir, 'feature_names.pkl')
-        with open(feature_names_path, 'wb') as f:
-            pickle.dump(self.feature_names, f)
+        files = [
+            (preprocessor_path, lambda f: pickle.dump(preprocessor, f)),
+            (feature_names_path, lambda f: pickle.dump(self.feature_names, f)),
+        ]
+        if state is not None:
+            state = {**state, 'rounds': int(model.get_booster().num_boosted_rounds()), 'saved_at': datetime.now().isoformat()}
+            files.append((os.path.join(fixed_model_dir, MODEL_STATE_FILE), lambda f: f.write(json.dumps(state, indent=2).encode('utf-8'))))
+        files.append((model_path, lambda f: pickle.dump(model, f)))
+
+        temp_paths = []
+        try:
+            for path, write in files:
+                temp_path = f"{path}.tmp-{os.getpid()}"
+                temp_paths.append(temp_path)
+                with open(temp_path, 'wb') as f:
+                    write(f)
+            for (path, _), temp_path in zip(files, temp_paths):
+                os.replace(temp_path, path)
+        finally:
+            for temp_path in temp_paths:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
 
         logger.info(f"Model saved to {model_path}")
         logger.info(f"Preprocessor saved to {preprocessor_path}")
 
         return model_path
 
-    def train_and_save(self) -> Dict[str, Any]:
+    def data_version(self) -> Dict[str, Any]:
         """
-        Train the model and save it.
+        Describe the current source data for stage cache keys.
+
+        The snapshot only ever appends rows until it is rebuilt, so its row
+        count, max key and creation time identify its contents.
 
         Returns:
-            Dictionary with model path and evaluation metrics
+            Snapshot row count, max key and creation time when use_snapshot is
+            set, otherwise db_utils.fraud_data_version (with a table checksum on MySQL)
         """
-        try:
-            # Load data
-            df = self.load_data()
+        if self.use_snapshot:
+            snapshot = FraudDataSnapshot()
+            snapshot.refresh()
+            manifest = snapshot.read_manifest()
+            return {
+                'source': 'snapshot', 'row_count': manifest['row_count'], 'max_key': manifest['max_key'],
+                'created_at': manifest['created_at']
+            }
+        return {'source': 'database', **fraud_data_version(get_db_engine())}
 
-            # Preprocess data
-            X, y = self.preprocess_data(df)
+    def prepare_data(self) -> Tuple[str, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Load, engineer, split and preprocess the data, or reuse a cached result.
 
-            # Engineer features
-            X_engineered = self.engineer_features(X)
+        The cache key covers the data version, sampling settings, dtype mode,
+        test split and FEATURE_PIPELINE_VERSION, but not the training settings,
+        so runs that only change the model reuse it.
 
-            # Create preprocessor
-            self.preprocessor = self.create_preprocessor(X_engineered)
+        Returns:
+            Tuple of (stage key, X_train, X_test, y_train, y_test)
+        """
+        key = None
+        if self.stage_cache is not None:
+            key = stage_key(
+                'prepared',
+                data=self.data_version(),
+                sample_size=self.sample_size,
+                random_state=self.random_state,
+                sampling_method=self.sampling_method,
+                stratified_sampling=self.stratified_sampling,
+                use_float32=self.use_float32,
+                test_size=self.test_size,
+                pipeline_version=FEATURE_PIPELINE_VERSION
+            )
+            cached = self.stage_cache.load('prepared', key)
+            if cached is not None:
+                arrays, objects = cached
+                self.preprocessor = objects['preprocessor']
+                self.feature_names = objects['feature_names']
+                return key, arrays['X_train'], arrays['X_test'], arrays['y_train'], arrays['y_test']
 
-            # Split data
-            X_train, X_test, y_train, y_test = self.split_data(X_engineered, y)
+        # Load data
+        df = self.load_data()
 
-            # Preprocess features
-            X_train_processed = self.preprocessor.fit_transform(X_train)
-            X_test_processed = self.preprocessor.transform(X_test)
+        # Preprocess data
+        X, y = self.preprocess_data(df)
 
+        # Engineer features
+        X_engineered = self.engineer_features(X)
+
+        # Create preprocessor
+        self.preprocessor = self.create_preprocessor(X_engineered)
+
+        # Split data
+        X_train, X_test, y_train, y_test = self.split_data(X_engineered, y)
+
+        # Preprocess features
+        X_train_processed = self.preprocessor.fit_transform(X_train)
+        X_test_processed = self.preprocessor.transform(X_test)
+
+        if self.stage_cache is not None:
+            if hasattr(X_train_processed, 'toarray'):
+                X_train_processed, X_test_processed = X_train_processed.toarray(), X_test_processed.toarray()
+            self.stage_cache.save(
+                'prepared', key,
+                {'X_train': X_train_processed, 'X_test': X_test_processed,
+                 'y_train': y_train.to_numpy(), 'y_test': y_test.to_numpy()},
+                {'preprocessor': self.preprocessor, 'feature_names': self.feature_names}
+            )
+
+        return key, X_train_processed, X_test_processed, y_train, y_test
+
+    def resample_training_data(
+        self, X_train: np.ndarray, y_train: Any, prepared_key: Optional[str] = None
+    ) -> Tuple[Any, Any, bool, Optional[np.ndarray]]:
+        """
+        Rebalance the training set by imbalance_strategy, or reuse a cached result.
+
+        - "smote": SMOTE over the full training set, up to one fraud row per legitimate row
+        - "smote_sample": neighborhood_smote, up to SMOTE_SAMPLE_RATIO
+        - "downsample": keep every fraud row and DOWNSAMPLE_NEGATIVE_RATIO legitimate
+          rows per fraud row, weighting kept legitimate rows by the inverse of the
+          keep rate so the weighted class totals match the original data
+        - "weight": no resampling; train_model applies scale_pos_weight
+
+        Args:
+            X_train: Preprocessed training features
+            y_train: Training target
+            prepared_key: Stage key of the prepared data (None disables caching)
+
+        Returns:
+            Tuple of (X_train_resampled, y_train_resampled, smote_applied, sample_weight);
+            smote_applied is True only when SMOTE balanced the classes
+        """
+        strategy = self.imbalance_strategy
+        if strategy == 'weight':
+            logger.info("Not resampling; class imbalance is handled with scale_pos_weight")
+            return X_train, y_train, False, None
+
+        key = None
+        if self.stage_cache is not None and prepared_key is not None:
+            settings = {
+                'smote': {},
+                'smote_sample': {'ratio': SMOTE_SAMPLE_RATIO, 'neighbor_sample': SMOTE_NEIGHBOR_SAMPLE, 'k_neighbors': SMOTE_NEIGHBORS},
+                'downsample': {'negative_ratio': DOWNSAMPLE_NEGATIVE_RATIO}
+            }[strategy]
+            key = stage_key('resampled', prepared=prepared_key, method=strategy, random_state=self.random_state, **settings)
+            cached = self.stage_cache.load('resampled', key)
+            if cached is not None:
+                arrays, objects = cached
+                # Entries written before imbalance strategies only record smote_applied
+                if not objects.get('resampled', objects['smote_applied']):
+                    return X_train, y_train, False, None
+                return arrays['X'], arrays['y'], objects['smote_applied'], arrays.get('weight')
+
+        sample_weight = None
+        smote_applied = False
+        if strategy == 'downsample':
+            y = np.asarray(y_train)
+            positives = np.flatnonzero(y == 1)
+            negatives = np.flatnonzero(y == 0)
+            keep_rate = min(1.0, DOWNSAMPLE_NEGATIVE_RATIO * len(positives) / max(1, len(negatives))) if len(positives) else 1.0
+            rng = np.random.default_rng(self.random_state)
+            kept = np.sort(np.concatenate([
+                positives, rng.choice(negatives, int(round(keep_rate * len(negatives))), replace=False)
+            ]))
+            X_train_resampled, y_train_resampled = X_train[kept], y[kept]
+            sample_weight = np.where(y_train_resampled == 0, 1.0 / keep_rate, 1.0).astype(np.float32)
+            logger.info(f"Kept {keep_rate:.2%} of legitimate rows; data shape after downsampling: {X_train_resampled.shape}")
+        elif strategy == 'smote_sample':
+            logger.info("Applying SMOTE over a neighborhood sample of the minority class (fraud)")
+            X_train_resampled, y_train_resampled = neighborhood_smote(X_train, y_train, random_state=self.random_state)
+            logger.info(f"Data shape after neighborhood SMOTE: {X_train_resampled.shape}, Class distribution: {np.bincount(y_train_resampled.astype(int))}")
+        else:
             # Apply SMOTE for oversampling the minority class (fraud)
             logger.info("Applying SMOTE to oversample the minority class (fraud)")
             try:
                 smote = SMOTE(random_state=self.random_state)
-                X_train_resampled, y_train_resampled = smote.fit_resample(X_train_processed, y_train)
+                X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
                 logger.info(f"Data shape after SMOTE: {X_train_resampled.shape}, Class distribution: {np.bincount(y_train_resampled.astype(int))}")
             except Exception as e:
                 logger.warning(f"SMOTE failed: {e}. Falling back to original imbalanced data.")
-                X_train_resampled, y_train_resampled = X_train_processed, y_train
+                X_train_resampled, y_train_resampled = X_train, y_train
+            smote_applied = X_train_resampled is not X_train
+
+        resampled = X_train_resampled is not X_train
+        if key is not None:
+            # A failed SMOTE is cached too, so the rerun skips straight to training
+            arrays = {'X': X_train_resampled, 'y': np.asarray(y_train_resampled)} if resampled else {}
+            if sample_weight is not None:
+                arrays['weight'] = sample_weight
+            self.stage_cache.save('resampled', key, arrays, {'resampled': resampled, 'smote_applied': smote_applied})
+
+        return X_train_resampled, y_train_resampled, smote_applied, sample_weight
+
+    def _transform_chunk(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Engineer and preprocess one chunk with the fitted preprocessor."""
+        X, y = self.preprocess_data(df)
+        X_processed = self.preprocessor.transform(self.engineer_features(X))
+        if hasattr(X_processed, 'toarray'):
+            X_processed = X_processed.toarray()
+        return X_processed.astype(np.float32, copy=False), y.to_numpy()
+
+    def train_external_and_save(self) -> Dict[str, Any]:
+        """
+        Train on the full (sampled) data out of core and save the model.
+
+        Chunks from the snapshot or database are engineered and preprocessed
+        one at a time. Training rows are fed to XGBoost through a DataIter and
+        cached on disk. Validation and test rows are chosen by a hash of the
+        primary key: at most EXTERNAL_MAX_VALIDATION_ROWS validation rows are
+        kept (reservoir-sampled) for early stopping, and test rows are scored
+        chunk by chunk in a further pass, keeping only their labels and
+        predicted probabilities. The preprocessor is
+        fitted on the first chunk: the trees are insensitive to the scaler's
+        affine map and the one-hot categories are fixed up front. Class
+        imbalance is handled with scale_pos_weight, as SMOTE needs the full
+        training set in memory.
+
+        Returns:
+            Dictionary with model path and evaluation metrics
+        """
+        def source():
+            return iter_compact_chunks(
+                self.sample_size, self.random_state, self.sampling_method,
+                self.stratified_sampling, self.use_snapshot, self.chunk_size
+            )
+
+        validation = ReservoirSample(EXTERNAL_MAX_VALIDATION_ROWS, self.random_state)
+        counts = {'passes': 0, 'rows': 0, 'positives': 0, 'max_key': None}
+
+        def chunks():
+            collect = counts['passes'] == 0
+            for df, keys in source():
+                buckets = split_buckets(keys, self.test_size, EXTERNAL_VALIDATION_SIZE, self.random_state)
+                X, y = self._transform_chunk(df)
+                train = buckets == TRAIN_BUCKET
+                if collect:
+                    validation.add(X[buckets == VALIDATION_BUCKET], y[buckets == VALIDATION_BUCKET])
+                    counts['rows'] += int(train.sum())
+                    counts['positives'] += int(y[train].sum())
+                    if len(keys):
+                        counts['max_key'] = max(int(keys.max()), counts['max_key'] or 0)
+                yield X[train], y[train]
+            counts['passes'] += 1
+
+        try:
+            logger.info(f"Training out of core in chunks of {self.chunk_size} rows")
+
+            # Fit the preprocessor on the first chunk
+            first_chunks = source()
+            first, _ = next(first_chunks)
+            first_chunks.close()
+            X_first, _ = self.preprocess_data(first)
+            X_first = self.engineer_features(X_first)
+            self.preprocessor = self.create_preprocessor(X_first, categories=COMPACT_CATEGORIES)
+            self.preprocessor.fit(X_first)
+            del first, X_first
+
+            cache_prefix = make_cache_prefix()
+            try:
+                dtrain = xgb.DMatrix(ChunkedDataIter(chunks, cache_prefix))
+                X_val, y_val = validation.arrays()
+                logger.info(f"Training rows: {counts['rows']}, validation rows: {len(y_val)} sampled of {validation.seen}")
+
+                negatives = counts['rows'] - counts['positives']
+                model_params = {
+                    'objective': 'binary:logistic',
+                    'eval_metric': 'auc',
+                    'random_state': self.random_state,
+                    'tree_method': 'hist',
+                    'scale_pos_weight': negatives / counts['positives'] if counts['positives'] else 1.0,
+                    **DEFAULT_TREE_PARAMS
+                }
+                booster = xgb.train(
+                    native_params(model_params), dtrain, num_boost_round=EXTERNAL_MAX_ROUNDS,
+                    evals=[(xgb.DMatrix(X_val, y_val), 'validation')],
+                    early_stopping_rounds=10,
+                    verbose_eval=False
+                )
+                del dtrain
+            finally:
+                remove_cache(cache_prefix)
+
+            self.model = booster_to_classifier(booster, {**model_params, 'n_estimators': booster.num_boosted_rounds()})
+            del X_val, y_val, validation
+
+            # Score the test rows chunk by chunk, keeping only labels and probabilities
+            y_parts, prob_parts, X_lime = [], [], []
+            for df, keys in source():
+                test = split_buckets(keys, self.test_size, EXTERNAL_VALIDATION_SIZE, self.random_state) == TEST_BUCKET
+                if not test.any():
+                    continue
+                X, y = self._transform_chunk(df[test])
+                y_parts.append(y)
+                prob_parts.append(self.model.predict_proba(X)[:, 1])
+                if sum(len(part) for part in X_lime) < EXTERNAL_LIME_ROWS:
+                    X_lime.append(X[:EXTERNAL_LIME_ROWS])
+            y_test = np.concatenate(y_parts)
+            logger.info(f"Test rows: {len(y_test)}")
+
+            # Evaluate model
+            metrics = self.evaluate_probabilities(y_test, np.concatenate(prob_parts))
+
+            # Generate LIME explanations
+            lime_explanations, feature_names = self.generate_lime_explanations(
+                self.model, np.concatenate(X_lime)[:EXTERNAL_LIME_ROWS]
+            )
+
+            # Save model
+            model_path = self.save_model(self.model, self.preprocessor, {'mode': 'full', 'max_key': counts['max_key']})
+
+            return {
+                'model_path': model_path,
+                'metrics': metrics,
+                'lime_explanations': lime_explanations,
+                'feature_names': feature_names
+            }
+
+        except Exception as e:
+            logger.error(f"Error during external-memory training: {e}")
+            raise
+
+    def load_saved_model(self) -> Tuple[xgb.XGBClassifier, ColumnTransformer, Optional[Dict[str, Any]]]:
+        """
+        Load the saved model, preprocessor and feature names.
+
+        Returns:
+            Tuple of (model, preprocessor, model state or None if it was saved without one)
+        """
+        with open(os.path.join(SAVED_MODEL_DIR, 'xgboost_fraud_model.pkl'), 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(SAVED_MODEL_DIR, 'preprocessor.pkl'), 'rb') as f:
+            preprocessor = pickle.load(f)
+        with open(os.path.join(SAVED_MODEL_DIR, 'feature_names.pkl'), 'rb') as f:
+            self.feature_names = pickle.load(f)
+
+        state = None
+        state_path = os.path.join(SAVED_MODEL_DIR, MODEL_STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+        return model, preprocessor, state
+
+    def train_incremental_and_save(self, mode: str = "continue") -> Dict[str, Any]:
+        """
+        Update the saved model from the rows added since it was trained.
+
+        Rows with a primary key above the saved watermark are read unsampled
+        and preprocessed with the saved preprocessor, then split by a hash of
+        their key into training, validation and holdout rows. The candidate
+        either continues boosting from the saved booster ("continue", early
+        stopping on the validation rows) or keeps its trees and refits their
+        leaf values on the new rows ("refresh"). Continued rounds keep the
+        saved booster's scale_pos_weight, so the added trees are fitted to the
+        same class weighting as the existing ones.
+
+        The candidate is saved, with the new watermark, only if its holdout
+        ROC AUC and PR AUC are within INCREMENTAL_TOLERANCE of the current
+        model's and it stays as well calibrated: log loss may rise by at most
+        INCREMENTAL_LOG_LOSS_TOLERANCE (relative) and the share of rows
+        flagged at ALERT_THRESHOLD by at most INCREMENTAL_ALERT_RATE_TOLERANCE.
+        Otherwise the rows stay pending for the next update. A running API picks up a promoted model
+        within predict.MODEL_RELOAD_INTERVAL seconds.
+
+        Args:
+            mode: "continue" or "refresh"
+
+        Returns:
+            Dictionary with promoted, rows, holdout_rows, current and candidate
+            holdout metrics, and the model path when promoted
+
+        Raises:
+            ValueError: If the mode is unknown or the saved model has no key watermark
+        """
+        if mode not in INCREMENTAL_MODES:
+            raise ValueError(f"Incremental mode must be one of {INCREMENTAL_MODES}")
+
+        model, self.preprocessor, state = self.load_saved_model()
+        if not state or state.get('max_key') is None:
+            raise ValueError(f"The saved model has no key watermark in {MODEL_STATE_FILE}; run a full training first")
+
+        parts = {bucket: ([], []) for bucket in (TRAIN_BUCKET, VALIDATION_BUCKET, TEST_BUCKET)}
+        watermark = state['max_key']
+        for df, keys in iter_compact_chunks(use_snapshot=self.use_snapshot, chunk_size=self.chunk_size, min_key=state['max_key']):
+            buckets = split_buckets(keys, self.test_size, EXTERNAL_VALIDATION_SIZE, self.random_state)
+            X, y = self._transform_chunk(df)
+            for bucket, (X_parts, y_parts) in parts.items():
+                X_parts.append(X[buckets == bucket])
+                y_parts.append(y[buckets == bucket])
+            if len(keys):
+                watermark = max(watermark, int(keys.max()))
+
+        rows = sum(len(y) for _, y_parts in parts.values() for y in y_parts)
+        result = {'promoted': False, 'rows': rows, 'holdout_rows': 0, 'current': None, 'candidate': None}
+        if rows == 0:
+            logger.info(f"No rows added since key {state['max_key']}; the model is up to date")
+            return result
+
+        X_train, y_train = (np.concatenate(part) for part in parts[TRAIN_BUCKET])
+        X_val, y_val = (np.concatenate(part) for part in parts[VALIDATION_BUCKET])
+        X_test, y_test = (np.concatenate(part) for part in parts[TEST_BUCKET])
+        result['holdout_rows'] = len(y_test)
+        logger.info(f"{rows} new rows since key {state['max_key']}: {len(y_train)} train, {len(y_val)} validation, {len(y_test)} holdout")
+
+        if y_test.sum() < INCREMENTAL_MIN_HOLDOUT_POSITIVES or y_test.sum() == len(y_test):
+            logger.info(f"Holdout has {int(y_test.sum())} fraud rows (need {INCREMENTAL_MIN_HOLDOUT_POSITIVES}); waiting for more labeled rows")
+            return result
+        if len(y_train) == 0:
+            logger.info("No new training rows outside the holdout; waiting for more labeled rows")
+            return result
+
+        def holdout_metrics(classifier: xgb.XGBClassifier) -> Dict[str, float]:
+            y_prob = classifier.predict_proba(X_test)[:, 1]
+            precision_curve, recall_curve, _ = precision_recall_curve(y_test, y_prob)
+            return {
+                'roc_auc': roc_auc_score(y_test, y_prob),
+                'pr_auc': auc(recall_curve, precision_curve),
+                'log_loss': log_loss(y_test, y_prob, labels=[0, 1]),
+                'alert_rate': float(np.mean(y_prob >= ALERT_THRESHOLD))
+            }
+
+        result['current'] = holdout_metrics(model)
+
+        booster = model.get_booster()
+        params = native_params(model.get_xgb_params())
+        if mode == 'refresh':
+            # Keep every tree's structure and recompute its leaf values (and node stats) on the new rows
+            params.update({'process_type': 'update', 'updater': 'refresh', 'refresh_leaf': True})
+            candidate_booster = xgb.train(
+                params, xgb.DMatrix(np.concatenate([X_train, X_val]), np.concatenate([y_train, y_val])),
+                num_boost_round=booster.num_boosted_rounds(), xgb_model=booster, verbose_eval=False
+            )
+        else:
+            # params keep the saved scale_pos_weight (unset for SMOTE-trained models):
+            # reweighting to the new rows' class ratio would shift every probability upward
+            candidate_booster = xgb.train(
+                params, xgb.DMatrix(X_train, y_train), num_boost_round=INCREMENTAL_ROUNDS, xgb_model=booster,
+                evals=[(xgb.DMatrix(X_val, y_val), 'validation')] if len(y_val) else (),
+                early_stopping_rounds=10 if len(y_val) else None,
+                verbose_eval=False
+            )
+            if len(y_val):
+                # Drop the rounds boosted past the best validation score
+                candidate_booster = candidate_booster[:candidate_booster.best_iteration + 1]
+        candidate = booster_to_classifier(
+            candidate_booster, {**model.get_params(), 'n_estimators': candidate_booster.num_boosted_rounds()}
+        )
+
+        result['candidate'] = holdout_metrics(candidate)
+        current, candidate_metrics = result['current'], result['candidate']
+        logger.info(f"Holdout ROC AUC {current['roc_auc']:.4f} -> {candidate_metrics['roc_auc']:.4f}, "
+                    f"PR AUC {current['pr_auc']:.4f} -> {candidate_metrics['pr_auc']:.4f}, "
+                    f"log loss {current['log_loss']:.4f} -> {candidate_metrics['log_loss']:.4f}, "
+                    f"alert rate {current['alert_rate']:.4%} -> {candidate_metrics['alert_rate']:.4%}")
+
+        if any(candidate_metrics[metric] < current[metric] - INCREMENTAL_TOLERANCE for metric in ('roc_auc', 'pr_auc')):
+            logger.warning("Incremental update regressed on the holdout; keeping the current model")
+            return result
+        if (candidate_metrics['log_loss'] > current['log_loss'] * (1 + INCREMENTAL_LOG_LOSS_TOLERANCE)
+                or candidate_metrics['alert_rate'] > current['alert_rate'] + INCREMENTAL_ALERT_RATE_TOLERANCE):
+            logger.warning("Incremental update shifted the holdout calibration; keeping the current model")
+            return result
+
+        self.model = candidate
+        result['promoted'] = True
+        result['model_path'] = self.save_model(candidate, self.preprocessor, {'mode': mode, 'max_key': watermark})
+        return result
+
+    def train_and_save(self) -> Dict[str, Any]:
+        """
+        Train the model and save it.
+
+        Returns:
+            Dictionary with model path and evaluation metrics
+        """
+        if self.external_memory:
+            return self.train_external_and_save()
+
+        try:
+            # Rows up to this key are covered by the model; incremental updates start after it.
+            # Taken before loading, so rows added meanwhile are above it (and at worst seen twice)
+            watermark = None if self.use_snapshot else fraud_data_max_key(get_db_engine())
+
+            # Load, engineer, split and preprocess (cached when the stage cache is enabled)
+            prepared_key, X_train_processed, X_test_processed, y_train, y_test = self.prepare_data()
+            if self.use_snapshot:
+                # The snapshot was refreshed by the load (or the cache key lookup) just now
+                watermark = (FraudDataSnapshot().read_manifest() or {}).get('max_key')
+
+            # Rebalance the classes by the configured imbalance strategy
+            X_train_resampled, y_train_resampled, smote_applied, sample_weight = self.resample_training_data(
+                X_train_processed, y_train, prepared_key
+            )
 
             # Train model with flag indicating whether SMOTE was successfully applied
-            smote_applied = X_train_resampled is not X_train_processed
-            self.model = self.train_model(X_train_resampled, y_train_resampled, smote_applied=smote_applied)
+            self.model = self.train_model(
+                X_train_resampled, y_train_resampled, smote_applied=smote_applied, sample_weight=sample_weight
+            )
 
             # Evaluate model
             metrics = self.evaluate_model(self.model, X_test_processed, y_test)
@@ -619,7 +1500,7 @@ class FraudModel:
             lime_explanations, feature_names = self.generate_lime_explanations(self.model, X_test_processed)
 
             # Save model
-            model_path = self.save_model(self.model, self.preprocessor)
+            model_path = self.save_model(self.model, self.preprocessor, {'mode': 'full', 'max_key': watermark})
 
             return {
                 'model_path': model_path,
@@ -632,6 +1513,128 @@ class FraudModel:
             logger.error(f"Error during model training: {e}")
             raise
 
+def _peak_rss_mib() -> float:
+    """Peak resident set size of this process in MiB (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _measure_feature_memory(method: str, model_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Load the data and build features one way, reporting peak RSS (run in a fresh process)."""
+    fraud_model = FraudModel(**model_kwargs)
+    df = fraud_model.load_data()
+    rows = len(df)
+    loaded = _peak_rss_mib()
+    if method == 'copy':
+        X = _engineer_features_with_copies(df)
+    else:
+        X = fraud_model.engineer_features(fraud_model.preprocess_data(df)[0])
+    return {
+        'method': method,
+        'rows': rows,
+        'loaded_mib': loaded,
+        'peak_mib': _peak_rss_mib(),
+        'features_mib': X.memory_usage(deep=True).sum() / (1024 * 1024)
+    }
+
+def benchmark_feature_memory(**model_kwargs) -> List[Dict[str, Any]]:
+    """
+    Compare peak RSS of copy-per-step and single-pass feature engineering.
+
+    Peak RSS only ever grows, so each method runs in its own spawned process.
+
+    Args:
+        **model_kwargs: FraudModel arguments selecting the data to load
+
+    Returns:
+        List of dictionaries with method, rows, loaded_mib, peak_mib and features_mib
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for method in ('copy', 'single-pass'):
+        with context.Pool(1) as pool:
+            results.append(pool.apply(_measure_feature_memory, (method, model_kwargs)))
+    return results
+
+def benchmark_search(**model_kwargs) -> List[Dict[str, Any]]:
+    """
+    Compare wall-clock time and test ROC / PR AUC of every search method.
+
+    The data is prepared and resampled once and shared by all methods; the
+    search history is not used, so no method is warm-started.
+
+    Args:
+        **model_kwargs: FraudModel arguments (search_method is overridden)
+
+    Returns:
+        List of dictionaries with method, seconds, roc_auc and pr_auc
+    """
+    fraud_model = FraudModel(**{**model_kwargs, 'search_history_path': None})
+    prepared_key, X_train, X_test, y_train, y_test = fraud_model.prepare_data()
+    X_train, y_train, smote_applied, sample_weight = fraud_model.resample_training_data(X_train, y_train, prepared_key)
+
+    results = []
+    for method in SEARCH_METHODS:
+        fraud_model.search_method = method
+        start = time.perf_counter()
+        model = fraud_model.train_model(X_train, y_train, smote_applied=smote_applied, sample_weight=sample_weight)
+        seconds = time.perf_counter() - start
+
+        y_prob = model.predict_proba(X_test)[:, 1]
+        precision_curve, recall_curve, _ = precision_recall_curve(y_test, y_prob)
+        results.append({
+            'method': method,
+            'seconds': seconds,
+            'roc_auc': roc_auc_score(y_test, y_prob),
+            'pr_auc': auc(recall_curve, precision_curve)
+        })
+    return results
+
+def _measure_imbalance_strategy(strategy: str, model_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Prepare the data, then resample and train one way, reporting time, peak RSS and test AUC (run in a fresh process)."""
+    fraud_model = FraudModel(**{**model_kwargs, 'imbalance_strategy': strategy, 'search_history_path': None})
+    _, X_train, X_test, y_train, y_test = fraud_model.prepare_data()
+    prepared = _peak_rss_mib()
+
+    # The resampled stage is never read from the cache, so every strategy pays its own cost
+    start = time.perf_counter()
+    X_train, y_train, smote_applied, sample_weight = fraud_model.resample_training_data(X_train, y_train)
+    model = fraud_model.train_model(X_train, y_train, smote_applied=smote_applied, sample_weight=sample_weight)
+    seconds = time.perf_counter() - start
+
+    y_prob = model.predict_proba(X_test)[:, 1]
+    precision_curve, recall_curve, _ = precision_recall_curve(y_test, y_prob)
+    return {
+        'strategy': strategy,
+        'train_rows': len(y_train),
+        'seconds': seconds,
+        'prepared_mib': prepared,
+        'peak_mib': _peak_rss_mib(),
+        'roc_auc': roc_auc_score(y_test, y_prob),
+        'pr_auc': auc(recall_curve, precision_curve)
+    }
+
+def benchmark_imbalance(**model_kwargs) -> List[Dict[str, Any]]:
+    """
+    Compare train time, peak RSS and test ROC / PR AUC of every imbalance strategy.
+
+    Each strategy runs in its own spawned process, as peak RSS only ever
+    grows; with use_stage_cache the prepared split is memory-mapped from the
+    cache instead of being rebuilt by every process.
+
+    Args:
+        **model_kwargs: FraudModel arguments (imbalance_strategy is overridden)
+
+    Returns:
+        List of dictionaries with strategy, train_rows, seconds, prepared_mib,
+        peak_mib, roc_auc and pr_auc
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for strategy in IMBALANCE_STRATEGIES:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(_measure_imbalance_strategy, (strategy, model_kwargs)))
+    return results
+
 def main():
     """Main function to train and save the fraud detection model."""
     import argparse
@@ -644,22 +1647,77 @@ def main():
     parser.add_argument('--use-float32', action='store_true', default=True, help='Use float32 instead of float64')
     parser.add_argument('--memory-efficient', action='store_true', default=True, help='Use memory-efficient approaches')
     parser.add_argument('--full-data', action='store_true', help='Use full dataset (overrides sample-size)')
+    parser.add_argument('--sampling-method', default='hash', choices=SAMPLING_METHODS, help='How the sample is drawn')
+    parser.add_argument('--stratified-sampling', action='store_true', help='Keep every fraud row when sampling')
+    parser.add_argument('--use-snapshot', action='store_true', help='Load from the local snapshot instead of querying the database')
+    parser.add_argument('--stage-cache', action='store_true', help='Reuse cached preprocessing and resampling stages')
+    parser.add_argument('--search', default='halving', choices=SEARCH_METHODS, help='Hyperparameter search method')
+    parser.add_argument('--time-budget', type=float, default=None, help='Seconds allowed for search and refit')
+    parser.add_argument('--no-search-history', action='store_true', help='Do not warm-start from or record to the search history')
+    parser.add_argument('--external-memory', action='store_true', help='Train out of core on the full (sampled) data in chunks')
+    parser.add_argument('--chunk-size', type=int, default=LOAD_CHUNK_SIZE, help='Rows per chunk for --external-memory')
+    parser.add_argument('--max-parallel-trials', type=int, default=None, help='Cap on concurrently trained search trials')
+    parser.add_argument('--benchmark-features', action='store_true', help='Only report peak RSS of feature engineering, before and after')
+    parser.add_argument('--benchmark-search', action='store_true', help='Only compare time and test AUC of each search method')
+    parser.add_argument('--imbalance-strategy', default='smote', choices=IMBALANCE_STRATEGIES, help='How class imbalance is handled')
+    parser.add_argument('--benchmark-imbalance', action='store_true', help='Only compare time, peak RSS and test AUC of each imbalance strategy')
+    parser.add_argument('--incremental', nargs='?', const='continue', default=None, choices=INCREMENTAL_MODES,
+                        help='Update the saved model from rows added since it was trained (default mode: continue)')
 
     args = parser.parse_args()
 
     # Determine sample size
     sample_size = None if args.full_data else args.sample_size
 
-    # Create and train model
-    fraud_model = FraudModel(
+    model_kwargs = dict(
         model_dir=args.model_dir,
         test_size=args.test_size,
         random_state=args.random_state,
         sample_size=sample_size,
         use_float32=args.use_float32,
-        memory_efficient=args.memory_efficient
+        memory_efficient=args.memory_efficient,
+        sampling_method=args.sampling_method,
+        stratified_sampling=args.stratified_sampling,
+        use_snapshot=args.use_snapshot,
+        use_stage_cache=args.stage_cache,
+        search_method=args.search,
+        time_budget=args.time_budget,
+        search_history_path=None if args.no_search_history else SEARCH_HISTORY_PATH,
+        external_memory=args.external_memory,
+        chunk_size=args.chunk_size,
+        max_parallel_trials=args.max_parallel_trials,
+        imbalance_strategy=args.imbalance_strategy
     )
 
+    if args.benchmark_features:
+        for result in benchmark_feature_memory(**model_kwargs):
+            print(f"{result['method']:<12} rows={result['rows']:<9} after load={result['loaded_mib']:9.1f} MiB  "
+                  f"peak={result['peak_mib']:9.1f} MiB  features={result['features_mib']:8.1f} MiB")
+        return
+
+    if args.benchmark_search:
+        for result in benchmark_search(**model_kwargs):
+            print(f"{result['method']:<10} {result['seconds']:9.1f}s  roc_auc={result['roc_auc']:.4f}  pr_auc={result['pr_auc']:.4f}")
+        return
+
+    if args.benchmark_imbalance:
+        for result in benchmark_imbalance(**model_kwargs):
+            print(f"{result['strategy']:<13} rows={result['train_rows']:<9} {result['seconds']:9.1f}s  "
+                  f"prepared={result['prepared_mib']:9.1f} MiB  peak={result['peak_mib']:9.1f} MiB  "
+                  f"roc_auc={result['roc_auc']:.4f}  pr_auc={result['pr_auc']:.4f}")
+        return
+
+    # Create and train model
+    fraud_model = FraudModel(**model_kwargs)
+
+    if args.incremental:
+        result = fraud_model.train_incremental_and_save(args.incremental)
+        if result['promoted']:
+            logger.info(f"Incremental update promoted. Model saved to {result['model_path']}")
+        else:
+            logger.info("Incremental update not promoted; the saved model is unchanged")
+        return
+
     try:
         result = fraud_model.train_and_save()
         logger.info(f"Model training completed. Model saved to {result['model_path']}")
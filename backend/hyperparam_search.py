@@ -0,0 +1,410 @@
+"""
+hyperparam_search.py - Budget-aware successive-halving / Hyperband search for XGBoost.
+
+Instead of fitting every grid combination on every fold, configurations are
+first trained on a small stratified fraction of the rows with few boosting
+rounds; only the best 1/eta of them move up a rung, where rows and rounds
+grow by eta, until the survivors are trained on all rows. Every trial uses
+early stopping on a fixed validation set. Hyperband runs several such
+brackets with different starting budgets, trading breadth for depth.
+
+Trials use the native xgb.train API on QuantileDMatrix objects built once
+per row subset and shared by every trial, instead of letting each
+XGBClassifier.fit re-quantize the same array; all of them reuse one set of
+histogram cuts.
+
+Trials of a rung can run concurrently on a thread pool (XGBoost releases
+the GIL while training), each with its own thread count, sharing the rung's
+matrix in-process; see scheduler.plan_training.
+
+Trials are scored by validation ROC AUC (PR AUC is recorded alongside). A
+time budget stops new trials, and interrupts a running one, once the search
+would no longer leave time for the final refit. Trial results can be
+appended to a JSON history file; the best configurations found by earlier
+searches are tried first in the next one (warm start).
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import xgboost as xgb
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SEARCH_METHODS = ("grid", "halving", "hyperband")
+
+# Trial history used to warm-start later searches
+SEARCH_HISTORY_PATH = os.getenv(
+    "SEARCH_HISTORY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "search_history.json")
+)
+
+# Most recent trials kept in the history file
+SEARCH_HISTORY_LIMIT = 500
+
+class DeadlineCallback(xgb.callback.TrainingCallback):
+    """Stop boosting once a time.monotonic() deadline has passed, but not before min_rounds."""
+
+    def __init__(self, deadline: Optional[float], min_rounds: int = 0):
+        super().__init__()
+        self.deadline = deadline
+        self.min_rounds = min_rounds
+        self.expired = False
+
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        if self.deadline is None or epoch + 1 < self.min_rounds or time.monotonic() < self.deadline:
+            return False
+        self.expired = True
+        return True
+
+def native_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translate XGBClassifier keyword arguments into xgb.train parameters.
+
+    Args:
+        params: XGBClassifier parameters
+
+    Returns:
+        Booster parameters (n_estimators and sklearn-only options removed)
+    """
+    renamed = {"random_state": "seed", "n_jobs": "nthread"}
+    skipped = {"n_estimators", "use_label_encoder", "early_stopping_rounds", "callbacks", "verbosity"}
+    return {renamed.get(name, name): value for name, value in params.items() if name not in skipped and value is not None}
+
+def booster_to_classifier(booster: xgb.Booster, params: Dict[str, Any]) -> xgb.XGBClassifier:
+    """
+    Wrap a binary-classification booster trained with xgb.train in an XGBClassifier.
+
+    The saved model, predict.py and LIME all use the scikit-learn interface.
+
+    Args:
+        booster: Trained booster
+        params: XGBClassifier parameters it was trained with
+
+    Returns:
+        Fitted classifier backed by booster
+    """
+    skipped = {"early_stopping_rounds", "callbacks"}
+    model = xgb.XGBClassifier(**{name: value for name, value in params.items() if name not in skipped})
+    model.load_model(bytearray(booster.save_raw(raw_format="json")))
+    model.n_classes_ = 2
+    return model
+
+def load_search_history(path: str) -> List[Dict[str, Any]]:
+    """Return the trials stored at path, or an empty list."""
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable search history {path}: {e}")
+        return []
+
+def save_search_history(path: str, trials: List[Dict[str, Any]]) -> None:
+    """Append trials to the history at path, keeping the most recent SEARCH_HISTORY_LIMIT."""
+    if not path:
+        return
+    history = (load_search_history(path) + trials)[-SEARCH_HISTORY_LIMIT:]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+class SuccessiveHalvingSearch:
+    """Successive-halving (optionally Hyperband) search over rows and boosting rounds."""
+
+    def __init__(
+        self,
+        base_params: Dict[str, Any],
+        search_space: Dict[str, Sequence[Any]],
+        max_rounds: int = 300,
+        min_rounds: int = 30,
+        eta: int = 3,
+        min_fraction: float = 1 / 9,
+        hyperband: bool = False,
+        time_budget: Optional[float] = None,
+        early_stopping_rounds: int = 10,
+        random_state: int = 42,
+        history_path: Optional[str] = SEARCH_HISTORY_PATH,
+        parallel_trials: int = 1,
+        threads_per_trial: Optional[int] = None
+    ):
+        """
+        Initialize the search.
+
+        Args:
+            base_params: XGBClassifier parameters shared by every trial
+            search_space: Candidate values per searched parameter
+            max_rounds: Boosting rounds at the top rung
+            min_rounds: Lower bound on boosting rounds at any rung
+            eta: Rung growth factor; 1/eta of the configurations survive each rung
+            min_fraction: Fraction of training rows used at the bottom rung
+            hyperband: If True, run every Hyperband bracket instead of one halving bracket
+            time_budget: Seconds available for search and refit, or None for no limit
+            early_stopping_rounds: Rounds without validation improvement before a trial stops
+            random_state: Seed for row subsets and configuration sampling
+            history_path: JSON file of earlier trials to warm-start from and append to (None disables)
+            parallel_trials: Trials of a rung trained concurrently
+            threads_per_trial: XGBoost threads per trial (None uses XGBoost's default)
+        """
+        self.base_params = base_params
+        self.search_space = {name: list(values) for name, values in search_space.items()}
+        self.max_rounds = max_rounds
+        self.min_rounds = min_rounds
+        self.eta = eta
+        self.rungs = max(1, int(round(math.log(1 / min_fraction, eta))) + 1)
+        self.hyperband = hyperband
+        self.time_budget = time_budget
+        self.early_stopping_rounds = early_stopping_rounds
+        self.random_state = random_state
+        self.history_path = history_path
+        self.parallel_trials = max(1, parallel_trials)
+        self.threads_per_trial = threads_per_trial
+
+        self.trials_: List[Dict[str, Any]] = []
+        self.best_params_: Optional[Dict[str, Any]] = None
+        self.best_rounds_: Optional[int] = None
+        self.best_score_: Optional[float] = None
+
+    def _budget(self, rung: int) -> Tuple[float, int]:
+        """Return the (row fraction, boosting rounds) of a rung."""
+        fraction = float(self.eta) ** (rung - (self.rungs - 1))
+        return fraction, max(self.min_rounds, int(round(self.max_rounds * fraction)))
+
+    def _row_subsets(self, y: np.ndarray) -> Dict[int, np.ndarray]:
+        """Nested, class-stratified row subsets for every rung."""
+        rng = np.random.default_rng(self.random_state)
+        by_class = [rng.permutation(np.flatnonzero(y == label)) for label in np.unique(y)]
+        subsets = {}
+        for rung in range(self.rungs):
+            fraction, _ = self._budget(rung)
+            if fraction >= 1.0:
+                subsets[rung] = None
+                continue
+            parts = [rows[:max(1, int(math.ceil(len(rows) * fraction)))] for rows in by_class]
+            subsets[rung] = np.sort(np.concatenate(parts))
+        return subsets
+
+    def _warm_start_configs(self) -> List[Dict[str, Any]]:
+        """Best earlier configurations that lie in the current search space."""
+        ranked = {}
+        for trial in load_search_history(self.history_path):
+            params = trial.get("params", {})
+            if set(params) != set(self.search_space) or any(
+                value not in self.search_space[name] for name, value in params.items()
+            ):
+                continue
+            signature = json.dumps(params, sort_keys=True)
+            rank = (trial.get("fraction", 0.0), trial.get("score", 0.0))
+            if signature not in ranked or rank > ranked[signature][0]:
+                ranked[signature] = (rank, params)
+        return [params for _, params in sorted(ranked.values(), key=lambda item: item[0], reverse=True)]
+
+    def _sample_configs(self, count: int, rng: np.random.Generator, warm: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Warm-start configurations first, then distinct random draws from the space."""
+        names = list(self.search_space)
+        grid = [dict(zip(names, values)) for values in itertools.product(*self.search_space.values())]
+        configs = [config for config in warm if config in grid][:count]
+        remaining = [config for config in grid if config not in configs]
+        if len(configs) < count and remaining:
+            chosen = rng.choice(len(remaining), size=min(count - len(configs), len(remaining)), replace=False)
+            configs.extend(remaining[i] for i in chosen)
+        return configs
+
+    def _run_trial(
+        self,
+        config: Dict[str, Any],
+        rung: int,
+        dtrain: xgb.DMatrix,
+        dval: xgb.DMatrix,
+        deadline: Optional[float]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Train one configuration at one rung's budget and score it on the validation set.
+
+        Returns None without training if the deadline passed while the trial was queued.
+        """
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+
+        fraction, rounds = self._budget(rung)
+        params = native_params({**self.base_params, **config})
+        params["eval_metric"] = ["aucpr", "auc"]
+        if self.threads_per_trial:
+            params["nthread"] = self.threads_per_trial
+
+        start = time.monotonic()
+        history: Dict[str, Dict[str, List[float]]] = {}
+        booster = xgb.train(
+            params, dtrain, num_boost_round=rounds,
+            evals=[(dval, "validation")],
+            early_stopping_rounds=self.early_stopping_rounds,
+            evals_result=history,
+            callbacks=[DeadlineCallback(deadline)],
+            verbose_eval=False
+        )
+
+        scores = history["validation"]
+        best_iteration = int(getattr(booster, "best_iteration", len(scores["auc"]) - 1))
+        return {
+            "params": config,
+            "rung": rung,
+            "fraction": fraction,
+            "rows": int(dtrain.num_row()),
+            "rounds": rounds,
+            "trained_rounds": len(scores["auc"]),
+            "best_iteration": best_iteration,
+            "score": float(scores["auc"][best_iteration]),
+            "pr_auc": float(scores["aucpr"][best_iteration]),
+            "seconds": time.monotonic() - start,
+            "truncated": deadline is not None and time.monotonic() >= deadline
+        }
+
+    def _brackets(self) -> List[Tuple[int, int]]:
+        """(configurations, starting rung) of every bracket to run."""
+        top = self.rungs - 1
+        if not self.hyperband:
+            return [(self.eta ** top, 0)]
+        return [
+            (int(math.ceil(self.rungs / (s + 1) * self.eta ** s)), top - s)
+            for s in range(top, -1, -1)
+        ]
+
+    def fit(
+        self,
+        X_train: np.ndarray,
+        y_train: Any,
+        X_val: np.ndarray,
+        y_val: Any,
+        reference: Optional[xgb.QuantileDMatrix] = None,
+        sample_weight: Optional[np.ndarray] = None,
+        val_sample_weight: Optional[np.ndarray] = None
+    ) -> "SuccessiveHalvingSearch":
+        """
+        Run the search.
+
+        One QuantileDMatrix is built per rung row subset and per validation
+        set, each the first time it is needed, and shared by every trial
+        that uses it. All of them take their histogram cuts from reference
+        (by default the top rung's matrix), so the data is sketched once.
+
+        Args:
+            X_train: Training features
+            y_train: Training target
+            X_val: Validation features used for early stopping and scoring
+            y_val: Validation target
+            reference: Matrix whose quantile cuts every search matrix reuses
+            sample_weight: Optional per-row training weights
+            val_sample_weight: Optional per-row validation weights
+
+        Returns:
+            self, with best_params_, best_rounds_, best_score_, trials_ and
+            validation_matrix_ set
+
+        Raises:
+            TimeoutError: If the time budget ran out before any trial finished
+        """
+        started = time.monotonic()
+        y_train = np.asarray(y_train)
+        y_val = np.asarray(y_val)
+        rng = np.random.default_rng(self.random_state)
+        subsets = self._row_subsets(y_train)
+
+        if reference is None:
+            reference = xgb.QuantileDMatrix(X_train, y_train, weight=sample_weight)
+            matrices = {self.rungs - 1: reference}
+        else:
+            matrices = {}
+        self.validation_matrix_ = xgb.QuantileDMatrix(X_val, y_val, weight=val_sample_weight, ref=reference)
+
+        def rung_matrix(rung: int) -> xgb.QuantileDMatrix:
+            if rung not in matrices:
+                rows = subsets[rung]
+                matrices[rung] = xgb.QuantileDMatrix(
+                    X_train if rows is None else X_train[rows],
+                    y_train if rows is None else y_train[rows],
+                    weight=sample_weight if rows is None or sample_weight is None else sample_weight[rows],
+                    ref=reference
+                )
+            return matrices[rung]
+
+        warm = self._warm_start_configs() if self.history_path else []
+        if warm:
+            logger.info(f"Warm-starting search with {min(len(warm), self.eta ** (self.rungs - 1))} configurations from {self.history_path}")
+
+        deadline = started + self.time_budget if self.time_budget else None
+        refit_estimate = 0.0
+        out_of_time = False
+
+        with ThreadPoolExecutor(max_workers=self.parallel_trials) as pool:
+            for count, first_rung in self._brackets():
+                configs = self._sample_configs(count, rng, warm)
+                for rung in range(first_rung, self.rungs):
+                    # Leave room for the final refit on all rows
+                    if deadline is not None and time.monotonic() + refit_estimate >= deadline:
+                        out_of_time = True
+                        break
+                    dtrain = rung_matrix(rung)
+                    trial_deadline = None if deadline is None else deadline - refit_estimate
+                    futures = [
+                        pool.submit(self._run_trial, config, rung, dtrain, self.validation_matrix_, trial_deadline)
+                        for config in configs
+                    ]
+
+                    results = []
+                    for future in futures:
+                        trial = future.result()
+                        if trial is None:
+                            out_of_time = True
+                            continue
+                        trial["bracket_start"] = first_rung
+                        self.trials_.append(trial)
+                        results.append(trial)
+                        refit_estimate = max(refit_estimate, trial["seconds"] * (len(y_train) / trial["rows"])
+                                             * (self.max_rounds / max(1, trial["trained_rounds"]))
+                                             / self.parallel_trials)
+                        logger.info(
+                            f"Trial rung={rung} rows={trial['rows']} rounds={trial['best_iteration'] + 1}/{trial['rounds']} "
+                            f"auc={trial['score']:.4f} pr_auc={trial['pr_auc']:.4f} {trial['seconds']:.1f}s {trial['params']}"
+                        )
+                    if out_of_time or rung == self.rungs - 1 or not results:
+                        break
+                    results.sort(key=lambda trial: trial["score"], reverse=True)
+                    configs = [trial["params"] for trial in results[:max(1, len(results) // self.eta)]]
+                if out_of_time:
+                    logger.warning(f"Time budget reached after {len(self.trials_)} trials")
+                    break
+
+        matrices.clear()
+        if not self.trials_:
+            raise TimeoutError("Time budget ran out before any search trial finished")
+
+        # Prefer trials that saw the most rows, then the best validation score
+        best = max(self.trials_, key=lambda trial: (trial["fraction"], trial["score"]))
+        self.best_params_ = dict(best["params"])
+        self.best_rounds_ = best["best_iteration"] + 1
+        self.best_score_ = best["score"]
+        logger.info(
+            f"Search finished: {len(self.trials_)} trials in {time.monotonic() - started:.1f}s, "
+            f"best auc={self.best_score_:.4f} with {self.best_rounds_} rounds {self.best_params_}"
+        )
+
+        if self.history_path:
+            save_search_history(self.history_path, [
+                {**trial, "recorded_at": time.time()} for trial in self.trials_
+            ])
+        return self
@@ -0,0 +1,410 @@
+"""
+live_feed.py - Live views of the most recently scored transactions and alerts.
+
+The scoring path publishes every stored transaction (and alert) into a
+fixed-size ring buffer, and list endpoints serve "latest N" reads from it
+without touching the database. Buffers are primed from the database at
+startup; until then, and for anything deeper than the buffer holds, callers
+fall back to the database.
+
+The same events are pushed to Server-Sent Events subscribers through a
+broadcaster that filters per subscriber and gives each one a bounded queue,
+dropping the oldest events for consumers that fall behind.
+
+Buffers and subscribers are per process. Deployments running several API
+workers should disable the buffers (RECENT_BUFFER_SIZE=0) unless each worker
+scores its own traffic.
+
+Usage (fan-out benchmark):
+    python live_feed.py [--subscribers N] [--events N] [--slow-fraction F]
+
+The benchmark drives in-process Subscriber queues only. It measures the
+broadcaster's filtering, queueing and drop path, not the cost of holding
+real SSE connections open (sockets, per-connection response tasks, TCP
+back-pressure); connection scaling has to be load-tested against
+/stream/transactions with an external HTTP client.
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from db_models import get_recent_transactions, get_recent_fraud_alerts
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Number of recent transactions and alerts kept in memory (0 disables the buffers)
+RECENT_BUFFER_SIZE = int(os.getenv("RECENT_BUFFER_SIZE", "1000"))
+
+# Events queued per live feed subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", "256"))
+
+# Maximum number of concurrent live feed subscribers
+MAX_SUBSCRIBERS = int(os.getenv("LIVE_FEED_MAX_SUBSCRIBERS", "10000"))
+
+class RecentBuffer:
+    """
+    Fixed-size ring buffer of the newest items, readable without locks.
+
+    Writers claim a sequence number from an atomic counter, store
+    (sequence, item) in slot sequence % capacity and advance the published
+    head under a short lock, so a slower writer never moves it back past a
+    newer one. Items are kept in publish (commit) order. Readers walk backwards
+    from the newest published sequence and stop at the first slot whose
+    sequence does not match, which happens when a slot was overwritten or
+    is still being written.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of items kept
+        """
+        self.capacity = capacity
+        self._slots: List[Optional[tuple]] = [None] * capacity
+        self._sequence = itertools.count()
+        self._head = -1
+        self._head_lock = threading.Lock()
+        self.primed = False
+        self.exhaustive = False
+
+    def append(self, item: Dict[str, Any]) -> None:
+        """Publish an item as the newest entry."""
+        if self.capacity <= 0:
+            return
+        sequence = next(self._sequence)
+        self._slots[sequence % self.capacity] = (sequence, item)
+        with self._head_lock:
+            if sequence > self._head:
+                self._head = sequence
+
+    def latest(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Return up to limit items, newest first.
+
+        Args:
+            limit: Maximum number of items
+
+        Returns:
+            List of items
+        """
+        items = []
+        sequence = self._head
+        while sequence >= 0 and len(items) < limit:
+            slot = self._slots[sequence % self.capacity]
+            if slot is None or slot[0] != sequence:
+                break
+            items.append(slot[1])
+            sequence -= 1
+        return items
+
+    def can_serve(self, limit: int) -> bool:
+        """
+        Check whether the newest limit items can be answered from memory.
+
+        True once the buffer has been primed and either holds at least limit
+        items or held every row that existed when it was primed.
+
+        Args:
+            limit: Number of items requested
+
+        Returns:
+            True if latest(limit) is authoritative
+        """
+        if self.capacity <= 0 or not self.primed:
+            return False
+        return limit <= min(self._head + 1, self.capacity) or self.exhaustive
+
+    def replace(self, match: Callable[[Dict[str, Any]], bool], update: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        """
+        Replace buffered items in place, e.g. after an alert is reviewed.
+
+        Args:
+            match: Predicate selecting items to replace
+            update: Function returning the replacement for a matched item
+        """
+        for index, slot in enumerate(self._slots):
+            if slot is not None and match(slot[1]):
+                self._slots[index] = (slot[0], update(slot[1]))
+
+    def prime(self, items: List[Dict[str, Any]]) -> None:
+        """
+        Load items from the database, newest first, and mark the buffer usable.
+
+        Args:
+            items: Up to capacity items ordered newest first
+        """
+        for item in reversed(items):
+            self.append(item)
+        self.exhaustive = len(items) < self.capacity
+        self.primed = True
+
+# Most recently stored transactions and alerts, filled by store_transaction_and_alert
+recent_transactions = RecentBuffer(RECENT_BUFFER_SIZE)
+recent_alerts = RecentBuffer(RECENT_BUFFER_SIZE)
+
+def prime_recent_buffers(db: Session) -> None:
+    """
+    Fill the recent buffers from the database, e.g. after a restart.
+
+    Args:
+        db: Database session
+    """
+    if RECENT_BUFFER_SIZE <= 0:
+        return
+    recent_transactions.prime([t.to_dict() for t in get_recent_transactions(db, limit=RECENT_BUFFER_SIZE)])
+    recent_alerts.prime([a.to_dict() for a in get_recent_fraud_alerts(db, limit=RECENT_BUFFER_SIZE)])
+    logger.info(f"Recent buffers primed with {len(recent_transactions.latest(RECENT_BUFFER_SIZE))} transactions "
+                f"and {len(recent_alerts.latest(RECENT_BUFFER_SIZE))} alerts")
+
+class Subscriber:
+    """A live feed consumer with its filters and bounded send queue."""
+
+    def __init__(
+        self,
+        transaction_types: Optional[Set[str]] = None,
+        min_probability: float = 0.0,
+        include_alerts: bool = True,
+        queue_size: int = SUBSCRIBER_QUEUE_SIZE
+    ):
+        """
+        Initialize the subscriber.
+
+        Args:
+            transaction_types: Only receive these transaction types (None for all)
+            min_probability: Only receive events at or above this fraud probability
+            include_alerts: Whether to receive new_alert events
+            queue_size: Events buffered before the oldest are dropped
+        """
+        self.transaction_types = transaction_types
+        self.min_probability = min_probability
+        self.include_alerts = include_alerts
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def wants(self, event_name: str, transaction_type: str, fraud_probability: float) -> bool:
+        """Check an event against this subscriber's filters."""
+        if event_name == "new_alert" and not self.include_alerts:
+            return False
+        if self.transaction_types is not None and transaction_type not in self.transaction_types:
+            return False
+        return fraud_probability >= self.min_probability
+
+    def offer(self, message: str) -> None:
+        """Queue a message, dropping the oldest queued one if the subscriber is behind."""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    def take_dropped(self) -> int:
+        """Return and reset the number of events dropped since the last call."""
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+class LiveFeedBroadcaster:
+    """
+    Fans scored transactions and alerts out to live feed subscribers.
+
+    Events are encoded once as SSE messages and offered to every matching
+    subscriber's queue on the event loop. publish() may be called from any
+    thread; the scoring path runs in the threadpool.
+    """
+
+    def __init__(self, max_subscribers: int = MAX_SUBSCRIBERS):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            max_subscribers: Maximum number of concurrent subscribers
+        """
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, subscriber: Subscriber) -> bool:
+        """
+        Register a subscriber. Must be called on the event loop.
+
+        Args:
+            subscriber: Subscriber to add
+
+        Returns:
+            False if the subscriber limit has been reached
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            return False
+        self._loop = asyncio.get_running_loop()
+        self._subscribers.add(subscriber)
+        return True
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber. Must be called on the event loop."""
+        self._subscribers.discard(subscriber)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_name: str, payload: Dict[str, Any], transaction_type: str, fraud_probability: float) -> None:
+        """
+        Broadcast an event to matching subscribers.
+
+        Args:
+            event_name: "new_transaction" or "new_alert"
+            payload: JSON-serializable event data
+            transaction_type: Transaction type used for filtering
+            fraud_probability: Fraud probability used for filtering
+        """
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+
+        message = f"event: {event_name}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._fan_out(message, event_name, transaction_type, fraud_probability)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, message, event_name, transaction_type, fraud_probability)
+
+    def _fan_out(self, message: str, event_name: str, transaction_type: str, fraud_probability: float) -> None:
+        """Offer an encoded message to every matching subscriber (runs on the event loop)."""
+        for subscriber in list(self._subscribers):
+            if subscriber.wants(event_name, transaction_type, fraud_probability):
+                subscriber.offer(message)
+
+# Live feed of scored transactions and alerts, filled by store_transaction_and_alert
+broadcaster = LiveFeedBroadcaster()
+
+def publish_scored_transaction(transaction: Dict[str, Any], alert: Optional[Dict[str, Any]]) -> None:
+    """
+    Publish a committed transaction and its alert to the live views.
+
+    Args:
+        transaction: Transaction dictionary (Transaction.to_dict format)
+        alert: Alert dictionary (FraudAlert.to_dict format), if one was raised
+    """
+    recent_transactions.append(transaction)
+    if alert is not None:
+        recent_alerts.append(alert)
+
+    transaction_type = transaction.get("transaction_type")
+    fraud_probability = transaction.get("fraud_probability") or 0.0
+    broadcaster.publish("new_transaction", transaction, transaction_type, fraud_probability)
+    if alert is not None:
+        broadcaster.publish("new_alert", alert, transaction_type, fraud_probability)
+
+async def run_fanout_benchmark(subscribers: int, events: int, slow_fraction: float) -> Dict[str, Any]:
+    """
+    Measure in-process fan-out to many subscribers.
+
+    Subscribers are plain in-memory queues, not HTTP connections, so the
+    results cover broadcaster overhead only and say nothing about how many
+    concurrent /stream/transactions clients a worker can sustain.
+
+    Fast subscribers drain their queues continuously; slow ones sleep between
+    reads so their queues overflow and exercise the drop path. Events are
+    published from a worker thread, as the scoring path does.
+
+    Args:
+        subscribers: Number of subscribers
+        events: Number of events to publish
+        slow_fraction: Fraction of subscribers that consume slowly
+
+    Returns:
+        Dictionary with publish rate, deliveries, drops and delivery latency percentiles
+    """
+    feed = LiveFeedBroadcaster(max_subscribers=subscribers)
+    latencies: List[float] = []
+    delivered = 0
+    done = asyncio.Event()
+
+    async def consume(subscriber: Subscriber, slow: bool) -> None:
+        nonlocal delivered
+        while not done.is_set() or not subscriber.queue.empty():
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                continue
+            sent_at = json.loads(message.split("data: ", 1)[1])["sent_at"]
+            latencies.append(time.perf_counter() - sent_at)
+            delivered += 1
+            if slow:
+                await asyncio.sleep(0.05)
+
+    slow_count = int(subscribers * slow_fraction)
+    consumers = []
+    all_subscribers = []
+    for i in range(subscribers):
+        subscriber = Subscriber()
+        feed.subscribe(subscriber)
+        all_subscribers.append(subscriber)
+        consumers.append(asyncio.create_task(consume(subscriber, i < slow_count)))
+
+    def produce() -> None:
+        for i in range(events):
+            payload = {"transaction_id": f"bench-{i}", "transaction_type": "TRANSFER",
+                       "fraud_probability": 0.9, "sent_at": time.perf_counter()}
+            feed.publish("new_transaction", payload, "TRANSFER", 0.9)
+
+    start = time.perf_counter()
+    await asyncio.to_thread(produce)
+    publish_seconds = time.perf_counter() - start
+
+    # Let queued fan-out callbacks and fast consumers catch up
+    await asyncio.sleep(0.5)
+    done.set()
+    await asyncio.gather(*consumers)
+
+    latencies.sort()
+    dropped = sum(s.dropped for s in all_subscribers)
+    return {
+        "mode": "in-process",
+        "subscribers": subscribers,
+        "events": events,
+        "publish_rate": events / publish_seconds if publish_seconds > 0 else float("inf"),
+        "delivered": delivered,
+        "dropped": dropped,
+        "latency_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "latency_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+    }
+
+def main():
+    """Main function to run the in-process live feed fan-out benchmark."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark in-process live feed fan-out (no real SSE connections)'
+    )
+    parser.add_argument('--subscribers', type=int, default=5000, help='Number of subscribers')
+    parser.add_argument('--events', type=int, default=200, help='Number of events to publish')
+    parser.add_argument('--slow-fraction', type=float, default=0.1, help='Fraction of slow subscribers')
+
+    args = parser.parse_args()
+
+    logger.info("In-process fan-out only: subscribers are in-memory queues, not SSE connections")
+    result = asyncio.run(run_fanout_benchmark(args.subscribers, args.events, args.slow_fraction))
+    for key, value in result.items():
+        logger.info(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,14 @@ import argparse
 import socket
 from datetime import datetime
 from dotenv import load_dotenv
-from db_models import init_db
+from db_models import init_db, SessionLocal, reconcile_transaction_stats
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fraud_model import FraudModel
 from data_simulator import TransactionSimulator
 from predict import app as predict_app
+from live_feed import prime_recent_buffers
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +22,26 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 from contextlib import asynccontextmanager
+import asyncio
+
+# Interval for recomputing the aggregate counters exactly (0 disables the job)
+STATS_RECONCILE_INTERVAL = int(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+
+def reconcile_stats():
+    db = SessionLocal()
+    try:
+        stats = reconcile_transaction_stats(db)
+        logger.info(f"Transaction stats reconciled: {stats.total_transactions} transactions")
+    finally:
+        db.close()
+
+async def run_stats_reconciliation(interval_seconds):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(reconcile_stats)
+        except Exception as e:
+            logger.error(f"Error reconciling transaction stats: {e}")
 
 @asynccontextmanager
 async def lifespan(app):
@@ -31,8 +52,24 @@ async def lifespan(app):
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
 
+    try:
+        db = SessionLocal()
+        try:
+            prime_recent_buffers(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Error priming recent transaction buffers: {e}")
+
+    reconcile_task = None
+    if STATS_RECONCILE_INTERVAL > 0:
+        reconcile_task = asyncio.create_task(run_stats_reconciliation(STATS_RECONCILE_INTERVAL))
+
     yield
 
+    if reconcile_task is not None:
+        reconcile_task.cancel()
+
     logger.info("Shutting down application...")
 
 app = FastAPI(
@@ -48,6 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Exact", "ETag", "Last-Modified"],
 )
 
 @app.get("/")
@@ -87,7 +125,8 @@ def find_available_port(start_port=8000, max_port=8100):
             return port
     raise RuntimeError(f"No available ports in range {start_port}-{max_port}")
 
-def simulate_transactions(batch_size=100, delay_seconds=0.5, limit=None, api_url=None, sample_size=None):
+def simulate_transactions(batch_size=100, delay_seconds=0.5, limit=None, api_url=None, sample_size=None,
+                          sampling_method="hash", stratified_sampling=False, use_snapshot=False):
     if api_url is None:
         api_url = os.getenv("API_URL", "http://localhost:8002/predict")
 
@@ -98,7 +137,10 @@ def simulate_transactions(batch_size=100, delay_seconds=0.5, limit=None, api_url
         batch_size=batch_size,
         delay_seconds=delay_seconds,
         api_url=api_url,
-        sample_size=sample_size
+        sample_size=sample_size,
+        sampling_method=sampling_method,
+        stratified_sampling=stratified_sampling,
+        use_snapshot=use_snapshot
     )
 
     try:
@@ -108,7 +150,10 @@ def simulate_transactions(batch_size=100, delay_seconds=0.5, limit=None, api_url
         logger.error(f"Error during transaction simulation: {e}")
         raise
 
-def train_model(model_dir=None, sample_size=0.3, use_float32=True, memory_efficient=True, full_data=False):
+def train_model(model_dir=None, sample_size=0.3, use_float32=True, memory_efficient=True, full_data=False,
+                sampling_method="hash", stratified_sampling=False, use_snapshot=False, stage_cache=False,
+                search_method="halving", time_budget=None, external_memory=False, imbalance_strategy="smote",
+                incremental=None):
     if model_dir is None:
         model_dir = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
 
@@ -123,10 +168,23 @@ def train_model(model_dir=None, sample_size=0.3, use_float32=True, memory_effici
         random_state=42,
         sample_size=sample_size,
         use_float32=use_float32,
-        memory_efficient=memory_efficient
+        memory_efficient=memory_efficient,
+        sampling_method=sampling_method,
+        stratified_sampling=stratified_sampling,
+        use_snapshot=use_snapshot,
+        use_stage_cache=stage_cache,
+        search_method=search_method,
+        time_budget=time_budget,
+        external_memory=external_memory,
+        imbalance_strategy=imbalance_strategy
     )
 
     try:
+        if incremental:
+            result = fraud_model.train_incremental_and_save(incremental)
+            logger.info(f"Incremental update {'promoted' if result['promoted'] else 'not promoted'} ({result['rows']} new rows)")
+            return result
+
         result = fraud_model.train_and_save()
         logger.info(f"Model training completed. Model saved to {result['model_path']}")
         logger.info(f"Model ROC AUC Score: {result['metrics']['roc_auc_score']:.4f}")
@@ -137,7 +195,10 @@ def train_model(model_dir=None, sample_size=0.3, use_float32=True, memory_effici
 
 def main(train=False, simulate=False, model_dir=None, sample_size=0.3, 
          use_float32=True, memory_efficient=True, full_data=False,
-         batch_size=100, delay_seconds=0.5, limit=None, api_url=None):
+         batch_size=100, delay_seconds=0.5, limit=None, api_url=None,
+         sampling_method="hash", stratified_sampling=False, use_snapshot=False, stage_cache=False,
+         search_method="halving", time_budget=None, external_memory=False, imbalance_strategy="smote",
+         incremental=None):
     try:
         if train:
             train_model(
@@ -145,7 +206,16 @@ def main(train=False, simulate=False, model_dir=None, sample_size=0.3,
                 sample_size=sample_size,
                 use_float32=use_float32,
                 memory_efficient=memory_efficient,
-                full_data=full_data
+                full_data=full_data,
+                sampling_method=sampling_method,
+                stratified_sampling=stratified_sampling,
+                use_snapshot=use_snapshot,
+                stage_cache=stage_cache,
+                search_method=search_method,
+                time_budget=time_budget,
+                external_memory=external_memory,
+                imbalance_strategy=imbalance_strategy,
+                incremental=incremental
             )
 
         if simulate:
@@ -154,7 +224,10 @@ def main(train=False, simulate=False, model_dir=None, sample_size=0.3,
                 delay_seconds=delay_seconds,
                 limit=limit,
                 api_url=api_url,
-                sample_size=sample_size
+                sample_size=sample_size,
+                sampling_method=sampling_method,
+                stratified_sampling=stratified_sampling,
+                use_snapshot=use_snapshot
             )
 
         logger.info("Initializing database...")
@@ -177,6 +250,15 @@ if __name__ == "__main__":
     parser.add_argument('--use-float32', action='store_true', default=True, help='Use float32 instead of float64')
     parser.add_argument('--memory-efficient', action='store_true', default=True, help='Use memory-efficient approaches')
     parser.add_argument('--full-data', action='store_true', help='Use full dataset (overrides sample-size)')
+    parser.add_argument('--sampling-method', default='hash', choices=['random', 'hash', 'block'], help='How the sample is drawn')
+    parser.add_argument('--stratified-sampling', action='store_true', help='Keep every fraud row when sampling')
+    parser.add_argument('--use-snapshot', action='store_true', help='Load data from the local snapshot instead of the database')
+    parser.add_argument('--stage-cache', action='store_true', help='Reuse cached preprocessing and resampling stages when training')
+    parser.add_argument('--search', default='halving', choices=['grid', 'halving', 'hyperband'], help='Hyperparameter search method')
+    parser.add_argument('--time-budget', type=float, default=None, help='Seconds allowed for hyperparameter search and refit')
+    parser.add_argument('--external-memory', action='store_true', help='Train out of core on the full (sampled) data in chunks')
+    parser.add_argument('--imbalance-strategy', default='smote', choices=['smote', 'smote_sample', 'downsample', 'weight'], help='How class imbalance is handled when training')
+    parser.add_argument('--incremental', nargs='?', const='continue', default=None, choices=['continue', 'refresh'], help='With --train, update the saved model from rows added since it was trained')
 
     parser.add_argument('--simulate', action='store_true', help='Simulate transactions after starting the server')
     parser.add_argument('--batch-size', type=int, default=100, help='Number of transactions to send in each batch')
@@ -198,7 +280,16 @@ if __name__ == "__main__":
         batch_size=args.batch_size,
         delay_seconds=args.delay,
         limit=args.limit,
-        api_url=args.api_url
+        api_url=args.api_url,
+        sampling_method=args.sampling_method,
+        stratified_sampling=args.stratified_sampling,
+        use_snapshot=args.use_snapshot,
+        stage_cache=args.stage_cache,
+        search_method=args.search,
+        time_budget=args.time_budget,
+        external_memory=args.external_memory,
+        imbalance_strategy=args.imbalance_strategy,
+        incremental=args.incremental
     )
 
     if not args.no_server:
@@ -218,7 +309,10 @@ if __name__ == "__main__":
                     delay_seconds=args.delay,
                     limit=args.limit,
                     api_url=api_url,
-                    sample_size=args.sample_size
+                    sample_size=args.sample_size,
+                    sampling_method=args.sampling_method,
+                    stratified_sampling=args.stratified_sampling,
+                    use_snapshot=args.use_snapshot
                 )
 
             simulation_thread = threading.Thread(target=run_simulation)
@@ -0,0 +1,235 @@
+"""
+migrate_accounts.py - Migrates transactions from account name strings to integer account keys.
+
+Older databases store `name_orig` and `name_dest` as VARCHAR(255) on every
+transaction row. This script creates the `accounts` table, interns every
+distinct name into it, fills `orig_account_id` / `dest_account_id` in id-range
+chunks, and finally drops the string columns. Table and index sizes and
+single-row insert throughput are measured before and after so the effect can
+be compared.
+
+Usage:
+    python migrate_accounts.py [--chunk-size ROWS] [--benchmark-rows ROWS]
+"""
+
+import time
+import logging
+import argparse
+from typing import Dict, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from db_models import Base, engine, resolve_account_id, account_id_cache
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Transactions updated per database transaction while backfilling keys
+MIGRATION_CHUNK_SIZE = 50000
+
+def get_table_sizes(engine: Engine, table_name: str = "transactions") -> Dict[str, Optional[int]]:
+    """
+    Get the on-disk data and index size of a table in bytes.
+
+    Args:
+        engine: SQLAlchemy engine
+        table_name: Table to measure
+
+    Returns:
+        Dictionary with data_bytes and index_bytes (None where the backend cannot report it)
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name == "mysql":
+            row = conn.execute(text("""
+                SELECT data_length, index_length FROM information_schema.tables
+                WHERE table_schema = DATABASE() AND table_name = :table_name
+            """), {"table_name": table_name}).first()
+            if row is None:
+                return {"data_bytes": None, "index_bytes": None}
+            return {"data_bytes": int(row[0]), "index_bytes": int(row[1])}
+
+        if engine.dialect.name == "sqlite":
+            try:
+                data_bytes = conn.execute(
+                    text("SELECT SUM(pgsize) FROM dbstat WHERE name = :table_name"),
+                    {"table_name": table_name}
+                ).scalar()
+                index_bytes = conn.execute(text("""
+                    SELECT SUM(d.pgsize) FROM dbstat d
+                    JOIN sqlite_master m ON m.name = d.name
+                    WHERE m.type = 'index' AND m.tbl_name = :table_name
+                """), {"table_name": table_name}).scalar()
+                return {"data_bytes": data_bytes, "index_bytes": index_bytes}
+            except Exception:
+                # dbstat is an optional compile-time extension
+                return {"data_bytes": None, "index_bytes": None}
+
+    return {"data_bytes": None, "index_bytes": None}
+
+def has_account_name_columns(engine: Engine) -> bool:
+    """Return True if transactions still stores account names as strings."""
+    columns = {column["name"] for column in inspect(engine).get_columns("transactions")}
+    return "name_orig" in columns
+
+def benchmark_inserts(engine: Engine, rows: int = 2000) -> Optional[float]:
+    """
+    Measure single-row transaction insert throughput on the current schema.
+
+    Rows reuse account names already present in the database, the way
+    PaySim traffic repeats accounts, and are rolled back afterwards.
+
+    Args:
+        engine: SQLAlchemy engine
+        rows: Number of rows to insert
+
+    Returns:
+        Inserts per second, or None if there is no data to draw accounts from
+    """
+    interned = not has_account_name_columns(engine)
+
+    with engine.connect() as conn:
+        if interned:
+            names = [r[0] for r in conn.execute(text("SELECT name FROM accounts LIMIT 1000"))]
+        else:
+            names = [r[0] for r in conn.execute(text("SELECT name_orig FROM transactions LIMIT 1000"))]
+        if not names:
+            return None
+
+        columns = "transaction_id, transaction_type, amount, old_balance_orig, new_balance_orig, old_balance_dest, new_balance_dest, is_fraud, fraud_probability, timestamp"
+        values = ":transaction_id, 'TRANSFER', 100.0, 1000.0, 900.0, 0.0, 100.0, 0, 0.1, CURRENT_TIMESTAMP"
+        if interned:
+            statement = text(f"INSERT INTO transactions ({columns}, orig_account_id, dest_account_id) VALUES ({values}, :orig, :dest)")
+        else:
+            statement = text(f"INSERT INTO transactions ({columns}, name_orig, name_dest) VALUES ({values}, :orig, :dest)")
+
+        account_id_cache.clear()
+        transaction = conn.begin()
+        session = Session(bind=conn)
+        try:
+            start = time.perf_counter()
+            for i in range(rows):
+                orig = names[i % len(names)]
+                dest = names[(i * 7 + 3) % len(names)]
+                if interned:
+                    orig = resolve_account_id(session, orig)
+                    dest = resolve_account_id(session, dest)
+                conn.execute(statement, {"transaction_id": f"benchmark-{i}-{time.time()}", "orig": orig, "dest": dest})
+            elapsed = time.perf_counter() - start
+        finally:
+            session.close()
+            transaction.rollback()
+
+    return rows / elapsed if elapsed > 0 else None
+
+def migrate(engine: Engine, chunk_size: int = MIGRATION_CHUNK_SIZE) -> None:
+    """
+    Intern account names into the accounts table and switch transactions to integer keys.
+
+    Each chunk of transaction ids is committed separately so the table is
+    never locked for the whole backfill. The final column swap is a single
+    ALTER TABLE.
+
+    Args:
+        engine: SQLAlchemy engine
+        chunk_size: Transactions processed per database transaction
+    """
+    # Creates accounts (and any other missing tables); existing tables are left alone
+    Base.metadata.create_all(bind=engine)
+
+    if not has_account_name_columns(engine):
+        logger.info("transactions already uses account keys; nothing to migrate")
+        return
+
+    columns = {column["name"] for column in inspect(engine).get_columns("transactions")}
+    with engine.begin() as conn:
+        for column in ("orig_account_id", "dest_account_id"):
+            if column not in columns:
+                conn.execute(text(f"ALTER TABLE transactions ADD COLUMN {column} INTEGER NULL"))
+
+    with engine.connect() as conn:
+        min_id, max_id = conn.execute(text("SELECT MIN(id), MAX(id) FROM transactions")).first()
+
+    if min_id is not None:
+        for low in range(min_id, max_id + 1, chunk_size):
+            high = low + chunk_size
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO accounts (name)
+                    SELECT names.name FROM (
+                        SELECT name_orig AS name FROM transactions WHERE id >= :low AND id < :high
+                        UNION
+                        SELECT name_dest AS name FROM transactions WHERE id >= :low AND id < :high
+                    ) names
+                    WHERE NOT EXISTS (SELECT 1 FROM accounts a WHERE a.name = names.name)
+                """), {"low": low, "high": high})
+                conn.execute(text("""
+                    UPDATE transactions SET
+                        orig_account_id = (SELECT a.id FROM accounts a WHERE a.name = transactions.name_orig),
+                        dest_account_id = (SELECT a.id FROM accounts a WHERE a.name = transactions.name_dest)
+                    WHERE id >= :low AND id < :high
+                """), {"low": low, "high": high})
+            logger.info(f"Backfilled account keys for ids {low}-{min(high, max_id + 1) - 1} of {max_id}")
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "mysql":
+            conn.execute(text("""
+                ALTER TABLE transactions
+                    MODIFY orig_account_id INTEGER NOT NULL,
+                    MODIFY dest_account_id INTEGER NOT NULL,
+                    ADD INDEX ix_transactions_orig_account_id (orig_account_id),
+                    ADD INDEX ix_transactions_dest_account_id (dest_account_id),
+                    ADD CONSTRAINT fk_transactions_orig_account FOREIGN KEY (orig_account_id) REFERENCES accounts (id),
+                    ADD CONSTRAINT fk_transactions_dest_account FOREIGN KEY (dest_account_id) REFERENCES accounts (id),
+                    DROP COLUMN name_orig,
+                    DROP COLUMN name_dest
+            """))
+        else:
+            # SQLite cannot add constraints to an existing table; indexes still apply
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transactions_orig_account_id ON transactions (orig_account_id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transactions_dest_account_id ON transactions (dest_account_id)"))
+            conn.execute(text("ALTER TABLE transactions DROP COLUMN name_orig"))
+            conn.execute(text("ALTER TABLE transactions DROP COLUMN name_dest"))
+
+    # Rebuild so the measured size reflects the narrower rows
+    with engine.connect() as conn:
+        if engine.dialect.name == "mysql":
+            conn.execute(text("OPTIMIZE TABLE transactions"))
+        elif engine.dialect.name == "sqlite":
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+    logger.info("Account key migration completed")
+
+def _format_bytes(value: Optional[int]) -> str:
+    """Format a byte count for the log, or 'n/a' if unknown."""
+    return f"{value / (1024 * 1024):.2f} MiB" if value is not None else "n/a"
+
+def main():
+    """Main function to run the account key migration with before/after measurements."""
+    parser = argparse.ArgumentParser(description='Intern transaction account names into integer keys')
+    parser.add_argument('--chunk-size', type=int, default=MIGRATION_CHUNK_SIZE, help='Transactions backfilled per database transaction')
+    parser.add_argument('--benchmark-rows', type=int, default=2000, help='Rows inserted (and rolled back) to measure throughput; 0 to skip')
+
+    args = parser.parse_args()
+
+    before_sizes = get_table_sizes(engine)
+    before_rate = benchmark_inserts(engine, args.benchmark_rows) if args.benchmark_rows and has_account_name_columns(engine) else None
+
+    migrate(engine, chunk_size=args.chunk_size)
+
+    after_sizes = get_table_sizes(engine)
+    after_rate = benchmark_inserts(engine, args.benchmark_rows) if args.benchmark_rows else None
+
+    logger.info(f"transactions data size:  {_format_bytes(before_sizes['data_bytes'])} -> {_format_bytes(after_sizes['data_bytes'])}")
+    logger.info(f"transactions index size: {_format_bytes(before_sizes['index_bytes'])} -> {_format_bytes(after_sizes['index_bytes'])}")
+    logger.info(f"accounts table size:     {_format_bytes(get_table_sizes(engine, 'accounts')['data_bytes'])}")
+    if before_rate is not None and after_rate is not None:
+        logger.info(f"Insert throughput: {before_rate:.0f} rows/s -> {after_rate:.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -16,19 +16,35 @@ import lime.lime_tabular
 import joblib
 import traceback
 import socket
-from fastapi import APIRouter, FastAPI, HTTPException, Depends, BackgroundTasks, Query
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field, validator
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
 import json
+import time
+import asyncio
 from sqlalchemy.orm import Session
 from sklearn.preprocessing import LabelEncoder
 
+from cache import ResponseCache, CachedResponse
+from serialization import RawJSON, dumps, encode_rows, encode_columns, encode_arrow, LIST_FORMATS
+from archive import arrow_schemas
+from export import stream_export, EXPORT_FORMATS, EXPORT_TABLES
+from live_feed import recent_transactions, recent_alerts, publish_scored_transaction, broadcaster, Subscriber
+
 # Import database models and session
-from db_models import Transaction, FraudAlert, get_db
+from db_models import (
+    Transaction, FraudAlert, get_db, encode_cursor, paginate_by_keyset,
+    increment_transaction_stats, increment_transaction_rollups, get_transaction_rollups, resolve_account_id,
+    get_transaction_detail, build_transaction_detail, transaction_detail_cache, mark_alert_as_reviewed,
+    get_transaction_stats, get_type_breakdown, SessionLocal, search_transactions, count_transactions, list_rows,
+    choose_rollup_resolution, ROLLUP_RESOLUTIONS
+)
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +63,9 @@ app = APIRouter(
 # Define models directory
 MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
 
+# Seconds between checks for a replaced model file, e.g. after an incremental update (0 disables reloading)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+
 def is_port_in_use(port):
     """Check if a port is already in use."""
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -123,11 +142,52 @@ class FraudPredictionService:
         # Initialize the LabelEncoder with known transaction types
         self.type_encoder.fit(['PAYMENT', 'TRANSFER', 'CASH_OUT', 'DEBIT', 'CASH_IN'])
 
+        # Modification time of the loaded model file and when to look for a newer one
+        self._model_mtime = None
+        self._next_reload_check = time.monotonic() + MODEL_RELOAD_INTERVAL
+
         # Load model and preprocessor
         self._load_model()
 
+    def _model_file_mtime(self) -> Optional[int]:
+        """Modification time of the model file in nanoseconds, or None if it is missing."""
+        try:
+            return os.stat(os.path.join(self.model_dir, 'xgboost_fraud_model.pkl')).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the model components if the model file was replaced since it was loaded.
+
+        FraudModel.save_model replaces the model file last (with os.replace),
+        after the preprocessor and feature names, so a changed model file
+        means a complete new set. Checks are rate-limited to one per
+        MODEL_RELOAD_INTERVAL seconds.
+
+        Returns:
+            True if the model was reloaded
+        """
+        if MODEL_RELOAD_INTERVAL <= 0 or time.monotonic() < self._next_reload_check:
+            return False
+        self._next_reload_check = time.monotonic() + MODEL_RELOAD_INTERVAL
+
+        mtime = self._model_file_mtime()
+        if mtime is None or mtime == self._model_mtime:
+            return False
+
+        # Load into a separate instance so requests keep using a complete set until the swap
+        fresh = FraudPredictionService(self.model_dir)
+        self.model, self.preprocessor, self.feature_names, self.explainer = (
+            fresh.model, fresh.preprocessor, fresh.feature_names, None
+        )
+        self._model_mtime = fresh._model_mtime
+        logger.info(f"Reloaded model from {self.model_dir}")
+        return True
+
     def _load_model(self):
         """Load the trained model, preprocessor, and feature names."""
+        self._model_mtime = self._model_file_mtime()
         try:
             # Load model
             model_path = os.path.join(self.model_dir, 'xgboost_fraud_model.pkl')
@@ -259,6 +319,9 @@ class FraudPredictionService:
             Dictionary with prediction results
         """
         try:
+            # Pick up a model saved since startup (full retrain or promoted incremental update)
+            self.reload_if_changed()
+
             # Preprocess transaction to engineer features
             df = self.preprocess_transaction(transaction)
 
@@ -490,112 +553,679 @@ async def predict_transaction(
             }
         )
 
+# Short-TTL response cache for endpoints polled by every open dashboard
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "5"))
+response_cache = ResponseCache(RESPONSE_CACHE_TTL)
+
+def is_not_modified(request: Request, entry: CachedResponse) -> bool:
+    """
+    Check a request's conditional headers against a cached response.
+
+    Args:
+        request: Incoming request
+        entry: Cached response
+
+    Returns:
+        True if the client's copy is current and a 304 can be returned
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return entry.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(entry.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def cached_json_response(
+    request: Request,
+    key: Any,
+    compute: Callable[[Session], Tuple[Any, Dict[str, str]]]
+) -> Response:
+    """
+    Serve a JSON payload through the response cache with ETag / Last-Modified support.
+
+    Concurrent requests for the same key share one computation, which runs
+    in the threadpool so the blocking database work stays off the event loop.
+    It gets its own session rather than the first requester's, which is
+    closed when that request ends (or disconnects) while others still wait.
+
+    Args:
+        request: Incoming request
+        key: Cache key
+        compute: Function taking a session and returning (payload, extra headers)
+
+    Returns:
+        304 response if the client's copy is current, otherwise the JSON body
+    """
+    entry = await response_cache.get_or_compute(key, lambda: run_in_threadpool(run_with_session, compute))
+    return cached_entry_response(request, entry)
+
+def cached_entry_response(request: Request, entry: CachedResponse) -> Response:
+    """
+    Build the HTTP response for a cached entry, honouring conditional headers.
+
+    Args:
+        request: Incoming request
+        entry: Cached response
+
+    Returns:
+        304 response if the client's copy is current, otherwise the JSON body
+    """
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": f"max-age={int(RESPONSE_CACHE_TTL)}",
+    }
+    if is_not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+class LeanJSONResponse(Response):
+    """JSON response that passes encoded bytes through and encodes anything else with dumps()."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+# Row-oriented JSON pages stay small; the columnar and Arrow encodings are
+# cheap enough per row to serve analytics-sized pages.
+MAX_JSON_LIST_LIMIT = 1000
+MAX_COLUMNAR_LIST_LIMIT = 10000
+
+def in_cursor_order(items: List[Dict[str, Any]]) -> bool:
+    """
+    Check that buffered items, newest first, are in descending (timestamp, id) order.
+
+    The buffer is in commit order; a page taken from it is only the same
+    page the database would return, and its last item a valid keyset
+    cursor, when commit order and (timestamp, id) order agree over the page
+    and the item after it.
+
+    Args:
+        items: Buffered items, newest first
+
+    Returns:
+        True if every item has a timestamp and the keys strictly decrease
+    """
+    keys = []
+    for item in items:
+        if not item["timestamp"]:
+            return False
+        keys.append((datetime.fromisoformat(item["timestamp"]), item["id"]))
+    return all(newer > older for newer, older in zip(keys, keys[1:]))
+
+def list_page(
+    db: Session,
+    model,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    output_format: str = "json"
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Fetch a page as an encoded body along with its pagination headers.
+
+    Rows are selected as column tuples and encoded directly, with alert
+    explanations passed through as stored. The cursor for the following page
+    is returned in the X-Next-Cursor header so the list response body stays
+    unchanged for existing clients.
+
+    Args:
+        db: Database session
+        model: Transaction or FraudAlert
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip (ignored when a cursor is given)
+        cursor: Cursor from the previous page's X-Next-Cursor header
+        output_format: "json" (array of rows), "columnar" (object of column arrays) or "arrow" (Arrow IPC stream)
+
+    Returns:
+        Tuple of (encoded body, response headers)
+    """
+    # Head-of-list reads come from the in-memory buffer filled by the scoring path
+    buffer = recent_transactions if model is Transaction else recent_alerts
+    if output_format == "json" and cursor is None and offset == 0 and buffer.can_serve(limit + 1):
+        items = buffer.latest(limit + 1)
+        if in_cursor_order(items):
+            headers = {}
+            if len(items) > limit:
+                items = items[:limit]
+                headers["X-Next-Cursor"] = encode_cursor(datetime.fromisoformat(items[-1]["timestamp"]), items[-1]["id"])
+            return RawJSON(dumps(items)), headers
+
+    try:
+        columns, rows, next_cursor = list_rows(db, model, limit, offset, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    raw_columns = ("explanation",) if model is FraudAlert else ()
+    if output_format == "columnar":
+        return encode_columns(columns, rows, raw_columns), headers
+    if output_format == "arrow":
+        transactions_schema, alerts_schema = arrow_schemas()
+        return encode_arrow(rows, transactions_schema if model is Transaction else alerts_schema), headers
+    return encode_rows(columns, rows, raw_columns), headers
+
+async def list_response(
+    request: Request,
+    db: Session,
+    name: str,
+    model,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    output_format: str
+) -> Response:
+    """
+    Serve a list endpoint page in the requested format.
+
+    First pages of JSON formats are served from the short-TTL response cache.
+
+    Args:
+        request: Incoming request
+        db: Database session
+        name: Cache key prefix
+        model: Transaction or FraudAlert
+        limit: Maximum number of rows to return
+        offset: Number of rows to skip
+        cursor: Keyset cursor returned with the previous page
+        output_format: One of LIST_FORMATS
+
+    Returns:
+        Response with the encoded page
+    """
+    if output_format not in LIST_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {list(LIST_FORMATS)}")
+    if output_format == "json" and limit > MAX_JSON_LIST_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Limit must be at most {MAX_JSON_LIST_LIMIT} for format=json; use format=columnar or arrow for larger pages"
+        )
+
+    if output_format != "arrow" and cursor is None and offset == 0:
+        return await cached_json_response(
+            request, (name, limit, output_format),
+            lambda session: list_page(session, model, limit, 0, None, output_format)
+        )
+
+    body, headers = list_page(db, model, limit, offset, cursor, output_format)
+    if output_format == "arrow":
+        return Response(content=body, media_type=LIST_FORMATS["arrow"], headers=headers)
+    return LeanJSONResponse(content=body, headers=headers)
+
 @app.get("/transactions", response_model=List[Dict[str, Any]])
 async def get_transactions(
-    limit: int = Query(100, ge=1, le=1000),
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_COLUMNAR_LIST_LIMIT, description="At most 1000 for format=json"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides offset"),
+    format: str = Query("json", description="json, columnar or arrow"),
     db: Session = Depends(get_db)
 ):
     """
     Get recent transactions.
 
+    The first page is served from the short-TTL response cache. format=columnar
+    returns an object of column arrays and format=arrow an Arrow IPC stream.
+
     Args:
+        request: Incoming request
+        limit: Maximum number of transactions to return (up to 10000 for columnar and arrow)
+        offset: Number of transactions to skip
+        cursor: Keyset cursor returned with the previous page
+        format: Output format
+        db: Database session
+
+    Returns:
+        List of transactions
+    """
+    try:
+        return await list_response(request, db, "transactions", Transaction, limit, offset, cursor, format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving transactions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/transactions/search", response_model=List[Dict[str, Any]])
+async def search_transaction_list(
+    transaction_type: Optional[str] = Query(None, description="Transaction type"),
+    min_amount: Optional[float] = Query(None, ge=0, description="Minimum amount"),
+    max_amount: Optional[float] = Query(None, ge=0, description="Maximum amount"),
+    min_probability: Optional[float] = Query(None, ge=0, le=1, description="Minimum fraud probability"),
+    max_probability: Optional[float] = Query(None, ge=0, le=1, description="Maximum fraud probability"),
+    account: Optional[str] = Query(None, description="Origin or destination account name"),
+    start: Optional[datetime] = Query(None, description="Range start"),
+    end: Optional[datetime] = Query(None, description="Range end"),
+    is_fraud: Optional[bool] = Query(None, description="Fraud flag"),
+    limit: int = Query(20, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides offset"),
+    count: Optional[str] = Query(None, description="exact or estimate to return X-Total-Count"),
+    db: Session = Depends(get_db)
+):
+    """
+    Search transactions with server-side filters.
+
+    Returns only the columns shown in the transactions table. With count set,
+    the total is returned in X-Total-Count; X-Total-Count-Exact tells whether
+    it is exact.
+
+    Args:
+        transaction_type: Transaction type filter
+        min_amount: Minimum amount
+        max_amount: Maximum amount
+        min_probability: Minimum fraud probability
+        max_probability: Maximum fraud probability
+        account: Account name filter
+        start: Range start
+        end: Range end
+        is_fraud: Fraud flag filter
         limit: Maximum number of transactions to return
         offset: Number of transactions to skip
+        cursor: Keyset cursor returned with the previous page
+        count: Count mode
         db: Database session
 
     Returns:
         List of transactions
     """
+    if count is not None and count not in ("exact", "estimate"):
+        raise HTTPException(status_code=400, detail="count must be exact or estimate")
+
+    filters = {
+        "transaction_type": transaction_type,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "min_probability": min_probability,
+        "max_probability": max_probability,
+        "account": account,
+        "start": start,
+        "end": end,
+        "is_fraud": is_fraud
+    }
+
     try:
-        transactions = db.query(Transaction).order_by(
-            Transaction.timestamp.desc()
-        ).offset(offset).limit(limit).all()
+        transactions, next_cursor = search_transactions(db, filters, cursor, limit, offset)
+
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        if count is not None:
+            total, exact = count_transactions(db, filters, estimate=count == "estimate")
+            headers["X-Total-Count"] = str(total)
+            headers["X-Total-Count-Exact"] = "true" if exact else "false"
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching transactions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return LeanJSONResponse(content=transactions, headers=headers)
+
+@app.get("/transactions/{transaction_id}")
+async def get_transaction(transaction_id: str, db: Session = Depends(get_db)):
+    """
+    Get a single transaction together with its fraud alert.
+
+    Args:
+        transaction_id: Transaction ID
+        db: Database session
 
-        return [transaction.to_dict() for transaction in transactions]
+    Returns:
+        Transaction dictionary with an "alert" entry (None if not flagged)
+    """
+    try:
+        detail = get_transaction_detail(db, transaction_id)
     except Exception as e:
-        logger.error(f"Error retrieving transactions: {e}")
+        logger.error(f"Error retrieving transaction {transaction_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    if detail is None:
+        raise HTTPException(status_code=404, detail=f"Transaction {transaction_id} not found")
+    return detail
+
 @app.get("/alerts", response_model=List[Dict[str, Any]])
 async def get_fraud_alerts(
-    limit: int = Query(100, ge=1, le=1000),
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_COLUMNAR_LIST_LIMIT, description="At most 1000 for format=json"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides offset"),
+    format: str = Query("json", description="json, columnar or arrow"),
     db: Session = Depends(get_db)
 ):
     """
     Get fraud alerts.
 
+    The first page is served from the short-TTL response cache. format=columnar
+    returns an object of column arrays and format=arrow an Arrow IPC stream.
+
     Args:
-        limit: Maximum number of alerts to return
+        request: Incoming request
+        limit: Maximum number of alerts to return (up to 10000 for columnar and arrow)
         offset: Number of alerts to skip
+        cursor: Keyset cursor returned with the previous page
+        format: Output format
         db: Database session
 
     Returns:
         List of fraud alerts
     """
     try:
-        alerts = db.query(FraudAlert).order_by(
-            FraudAlert.timestamp.desc()
-        ).offset(offset).limit(limit).all()
-
-        return [alert.to_dict() for alert in alerts]
+        return await list_response(request, db, "alerts", FraudAlert, limit, offset, cursor, format)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving fraud alerts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class AlertReviewRequest(BaseModel):
+    reviewed_by: str = Field(..., description="Username of the reviewer")
+    review_notes: Optional[str] = Field(None, description="Optional review notes")
+
+@app.put("/alerts/{alert_id}/review")
+async def review_alert(alert_id: int, review: AlertReviewRequest, db: Session = Depends(get_db)):
+    """
+    Mark a fraud alert as reviewed.
+
+    Args:
+        alert_id: Fraud alert ID
+        review: Reviewer and notes
+        db: Database session
+
+    Returns:
+        Updated fraud alert
+    """
+    try:
+        alert = mark_alert_as_reviewed(db, alert_id, review.reviewed_by, review.review_notes)
+    except Exception as e:
+        logger.error(f"Error reviewing alert {alert_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if alert is None:
+        raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
+
+    alert_dict = alert.to_dict()
+    recent_alerts.replace(lambda item: item["id"] == alert_dict["id"], lambda item: alert_dict)
+    return alert_dict
+
 @app.get("/stats")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(request: Request):
     """
     Get transaction statistics.
 
     Args:
-        db: Database session
+        request: Incoming request
 
     Returns:
         Dictionary with transaction statistics
     """
     try:
-        from db_models import get_transaction_stats
-        stats = get_transaction_stats(db)
-        return stats
+        return await cached_json_response(request, "stats", lambda session: (get_transaction_stats(session), {}))
     except Exception as e:
         logger.error(f"Error retrieving transaction statistics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def build_dashboard_data(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the dashboard KPI payload from the transaction statistics.
+
+    Args:
+        stats: Result of get_transaction_stats
+
+    Returns:
+        Dictionary with dashboard statistics in the required format
+    """
+    # Calculate fraud rate as a percentage
+    fraud_rate = 0.0
+    if stats["total_transactions"] > 0:
+        fraud_rate = (stats["total_frauds"] / stats["total_transactions"]) * 100.0
+
+    # Format the response according to the required structure
+    return {
+        "total_transactions": stats["total_transactions"],
+        "total_amount": stats["total_amount"],
+        "fraudulent_transactions": stats["total_frauds"],
+        "fraud_rate": fraud_rate
+    }
+
 @app.get("/dashboard-data")
-async def get_dashboard_data(db: Session = Depends(get_db)):
+async def get_dashboard_data(request: Request):
     """
     Get dashboard data for the React frontend.
 
     Args:
-        db: Database session
+        request: Incoming request
 
     Returns:
         Dictionary with dashboard statistics in the required format
     """
     try:
-        from db_models import get_transaction_stats
-        stats = get_transaction_stats(db)
-
-        # Calculate fraud rate as a percentage
-        fraud_rate = 0.0
-        if stats["total_transactions"] > 0:
-            fraud_rate = (stats["total_frauds"] / stats["total_transactions"]) * 100.0
-
-        # Format the response according to the required structure
-        dashboard_data = {
-            "total_transactions": stats["total_transactions"],
-            "total_amount": stats["total_amount"],
-            "fraudulent_transactions": stats["total_frauds"],
-            "fraud_rate": fraud_rate
-        }
-
-        return dashboard_data
+        return await cached_json_response(request, "dashboard-data", lambda session: (build_dashboard_data(get_transaction_stats(session)), {}))
     except Exception as e:
         logger.error(f"Error retrieving dashboard data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def run_with_session(fn: Callable[[Session], Any]) -> Any:
+    """
+    Run fn with its own short-lived session.
+
+    Sessions are not safe to share between threads, so each concurrent
+    sub-query of a composite endpoint checks out its own connection.
+
+    Args:
+        fn: Function taking a session
+
+    Returns:
+        The function's result
+    """
+    db = SessionLocal()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+def build_dashboard_snapshot_parts(transactions_limit: int, alerts_limit: int, window_hours: int):
+    """Return the named sub-queries that make up a dashboard snapshot."""
+    end = datetime.now()
+    start = end - timedelta(hours=window_hours)
+    return {
+        "stats": lambda db: get_transaction_stats(db),
+        "recent_transactions": lambda db: list_page(db, Transaction, transactions_limit, 0, None)[0],
+        "recent_alerts": lambda db: list_page(db, FraudAlert, alerts_limit, 0, None)[0],
+        "type_breakdown": lambda db: get_type_breakdown(db, start, end),
+    }
+
+@app.get("/dashboard/snapshot")
+async def get_dashboard_snapshot(
+    request: Request,
+    transactions_limit: int = Query(5, ge=1, le=100),
+    alerts_limit: int = Query(100, ge=1, le=1000),
+    window_hours: int = Query(24, ge=1, le=24 * 90, description="Hours covered by the type breakdown")
+):
+    """
+    Get everything the dashboard renders on load in one payload.
+
+    KPIs, recent transactions, recent alerts and the per-type breakdown are
+    queried concurrently, each on its own session, and the combined result
+    goes through the response cache like the individual endpoints.
+
+    Args:
+        request: Incoming request
+        transactions_limit: Number of recent transactions to include
+        alerts_limit: Number of recent alerts to include
+        window_hours: Hours covered by the type breakdown
+
+    Returns:
+        Dictionary with stats, dashboard, recent_transactions, recent_alerts and type_breakdown
+    """
+    async def compute():
+        parts = build_dashboard_snapshot_parts(transactions_limit, alerts_limit, window_hours)
+        results = await asyncio.gather(*[
+            run_in_threadpool(run_with_session, fn) for fn in parts.values()
+        ])
+        snapshot = dict(zip(parts.keys(), results))
+
+        snapshot["dashboard"] = build_dashboard_data(snapshot["stats"])
+        snapshot["generated_at"] = datetime.now().isoformat()
+        return snapshot, {}
+
+    try:
+        entry = await response_cache.get_or_compute(
+            ("dashboard-snapshot", transactions_limit, alerts_limit, window_hours), compute
+        )
+        return cached_entry_response(request, entry)
+    except Exception as e:
+        logger.error(f"Error retrieving dashboard snapshot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def to_naive_local(value: datetime) -> datetime:
+    """Convert an aware datetime to naive local time; naive values are returned unchanged."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+@app.get("/rollups")
+async def get_rollups(
+    start: Optional[datetime] = Query(None, description="Range start (default: 24 hours before end)"),
+    end: Optional[datetime] = Query(None, description="Range end (default: now)"),
+    resolution: Optional[str] = Query(None, description="minute or hour (default: chosen from the range)"),
+    transaction_type: Optional[str] = Query(None, description="Restrict to one transaction type"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get time-bucketed transaction aggregates for timeline and heatmap charts.
+
+    Args:
+        start: Range start
+        end: Range end
+        resolution: Rollup resolution
+        transaction_type: Optional transaction type filter
+        db: Database session
+
+    Returns:
+        Dictionary with the resolution used and the rollup buckets
+    """
+    if resolution is not None and resolution not in ROLLUP_RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Resolution must be one of {list(ROLLUP_RESOLUTIONS)}")
+
+    # Timestamps are stored as naive local time; convert aware query values to match
+    end = to_naive_local(end) if end else datetime.now()
+    start = to_naive_local(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    try:
+        resolution = resolution or choose_rollup_resolution(start, end)
+        rollups = get_transaction_rollups(db, start, end, resolution, transaction_type)
+
+        return {
+            "resolution": resolution,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "buckets": [rollup.to_dict() for rollup in rollups]
+        }
+    except Exception as e:
+        logger.error(f"Error retrieving rollups: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/export/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("csv", description="csv, ndjson, columnar, arrow or parquet"),
+    start: Optional[datetime] = Query(None, description="Range start"),
+    end: Optional[datetime] = Query(None, description="Range end"),
+    transaction_type: Optional[str] = Query(None, description="Restrict to one transaction type"),
+):
+    """
+    Stream a bulk export of transactions or fraud alerts.
+
+    Args:
+        table: "transactions" or "alerts"
+        format: Output format
+        start: Range start
+        end: Range end
+        transaction_type: Optional transaction type filter
+
+    Returns:
+        Streaming response with the exported rows
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Table must be one of {list(EXPORT_TABLES)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {list(EXPORT_FORMATS)}")
+
+    filename = f"{table}-{datetime.now().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream_export(table, format, start, end, transaction_type),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Seconds between keep-alive comments on idle live feed streams
+LIVE_FEED_KEEPALIVE = float(os.getenv("LIVE_FEED_KEEPALIVE", "15"))
+
+@app.get("/stream/transactions")
+async def stream_transactions(
+    request: Request,
+    transaction_type: Optional[List[str]] = Query(None, description="Only stream these transaction types"),
+    min_probability: float = Query(0.0, ge=0, le=1, description="Only stream events at or above this fraud probability"),
+    include_alerts: bool = Query(True, description="Also stream new_alert events"),
+):
+    """
+    Stream newly scored transactions and alerts as Server-Sent Events.
+
+    Events are named new_transaction and new_alert and carry the same JSON
+    as the list endpoints. Slow clients lose their oldest queued events; a
+    dropped event reports how many were skipped.
+
+    Args:
+        request: Incoming request
+        transaction_type: Optional transaction type filter (repeatable)
+        min_probability: Minimum fraud probability
+        include_alerts: Whether to include alert events
+
+    Returns:
+        Streaming text/event-stream response
+    """
+    subscriber = Subscriber(
+        transaction_types=set(transaction_type) if transaction_type else None,
+        min_probability=min_probability,
+        include_alerts=include_alerts
+    )
+    if not broadcaster.subscribe(subscriber):
+        raise HTTPException(status_code=503, detail="Too many live feed subscribers")
+
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=LIVE_FEED_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                dropped = subscriber.take_dropped()
+                if dropped:
+                    yield f"event: dropped\ndata: {json.dumps({'count': dropped})}\n\n"
+                yield message
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 def store_transaction_and_alert(
     db: Session,
     transaction_data: Dict[str, Any],
@@ -615,10 +1245,10 @@ def store_transaction_and_alert(
             transaction_id=prediction_result['transaction_id'],
             transaction_type=transaction_data['type'],
             amount=transaction_data['amount'],
-            name_orig=transaction_data['nameOrig'],
+            orig_account_id=resolve_account_id(db, transaction_data['nameOrig']),
             old_balance_orig=transaction_data['oldbalanceOrg'],
             new_balance_orig=transaction_data['newbalanceOrig'],
-            name_dest=transaction_data['nameDest'],
+            dest_account_id=resolve_account_id(db, transaction_data['nameDest']),
             old_balance_dest=transaction_data['oldbalanceDest'],
             new_balance_dest=transaction_data['newbalanceDest'],
             is_fraud=prediction_result['is_fraud'],
@@ -628,7 +1258,24 @@ def store_transaction_and_alert(
 
         db.add(transaction)
 
+        # Keep the running aggregates in step with the stored row
+        increment_transaction_stats(
+            db,
+            amount=transaction_data['amount'],
+            is_fraud=prediction_result['is_fraud'],
+            fraud_probability=prediction_result['fraud_probability']
+        )
+        increment_transaction_rollups(
+            db,
+            timestamp=transaction.timestamp,
+            transaction_type=transaction.transaction_type,
+            amount=transaction_data['amount'],
+            is_fraud=prediction_result['is_fraud'],
+            fraud_probability=prediction_result['fraud_probability']
+        )
+
         # If fraud is detected, create alert
+        alert = None
         if prediction_result['is_fraud']:
             explanation = json.dumps(prediction_result.get('explanation', []))
 
@@ -641,9 +1288,19 @@ def store_transaction_and_alert(
 
             db.add(alert)
 
+        # Build the detail payload while the rows are still loaded, cache it once committed
+        db.flush()
+        detail = build_transaction_detail(transaction, alert)
+
         # Commit changes
         db.commit()
 
+        transaction_detail_cache.put(transaction.transaction_id, detail)
+        publish_scored_transaction(
+            {key: value for key, value in detail.items() if key != "alert"},
+            detail["alert"]
+        )
+
     except Exception as e:
         db.rollback()
         logger.error(f"Error storing transaction and alert: {e}")
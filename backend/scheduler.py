@@ -0,0 +1,148 @@
+"""
+scheduler.py - Resource-aware parallelism for model training.
+
+Measures the cores this process may use and the memory currently
+available, estimates what one training trial needs from the data shape,
+and splits the cores into parallel trials and threads per trial so that
+XGBoost's own threads do not oversubscribe the machine alongside the trial
+workers, and the trials in flight fit in memory. Arrays handed to joblib
+worker processes (GridSearchCV) are shared by joblib itself, which
+memory-maps arguments larger than its max_nbytes threshold.
+
+Usage (print the plan for a data shape):
+    python scheduler.py --rows N --features N [--trials N]
+"""
+
+import os
+import logging
+import argparse
+from dataclasses import dataclass
+from typing import Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Share of available memory the scheduler may plan to use
+MEMORY_HEADROOM = 0.8
+
+# Bytes per row and feature of a hist training trial: uint8 bin index and a
+# float64 row-subset copy (CV folds), plus gradient / prediction buffers per row
+BIN_BYTES_PER_VALUE = 1
+SUBSET_BYTES_PER_VALUE = 8
+BYTES_PER_ROW = 32
+
+@dataclass
+class ResourcePlan:
+    """Parallel trials and threads per trial chosen for the machine and data."""
+    cores: int
+    available_bytes: int
+    trial_bytes: int
+    parallel_trials: int
+    threads_per_trial: int
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity / container cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+def available_memory() -> int:
+    """
+    Bytes of memory available to new allocations.
+
+    Uses MemAvailable from /proc/meminfo (which counts reclaimable page
+    cache), then free physical pages from os.sysconf.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        # Unknown: assume 4 GiB
+        return 4 * 1024 ** 3
+
+def estimate_trial_memory(rows: int, features: int, shared_data: bool = False) -> int:
+    """
+    Estimate peak bytes of one hist training trial on rows x features.
+
+    Args:
+        rows: Training rows of the trial
+        features: Feature columns
+        shared_data: Whether the quantized matrix is shared between trials
+                     (threaded search) rather than built by each trial
+
+    Returns:
+        Estimated bytes
+    """
+    if shared_data:
+        return int(rows * BYTES_PER_ROW)
+    return int(rows * features * (BIN_BYTES_PER_VALUE + SUBSET_BYTES_PER_VALUE) + rows * BYTES_PER_ROW)
+
+def plan_training(
+    rows: int,
+    features: int,
+    trials: int = 1,
+    max_parallel: Optional[int] = None,
+    shared_data: bool = False
+) -> ResourcePlan:
+    """
+    Choose parallel trials and threads per trial.
+
+    Parallelism is limited by cores, by how many trials fit in the memory
+    headroom, by the number of trials and by max_parallel; the cores are
+    then divided evenly between the parallel trials.
+
+    Args:
+        rows: Training rows of the largest trial
+        features: Feature columns
+        trials: Trials that can run concurrently
+        max_parallel: Optional cap on parallel trials
+        shared_data: Whether trials share one quantized matrix (counted once)
+
+    Returns:
+        ResourcePlan
+    """
+    cores = available_cores()
+    memory = available_memory()
+    trial_bytes = max(1, estimate_trial_memory(rows, features, shared_data))
+    shared_bytes = rows * features * BIN_BYTES_PER_VALUE if shared_data else 0
+
+    fits_in_memory = max(1, int((memory * MEMORY_HEADROOM - shared_bytes) // trial_bytes))
+    parallel = max(1, min(cores, fits_in_memory, max(1, trials), max_parallel or cores))
+    plan = ResourcePlan(
+        cores=cores,
+        available_bytes=memory,
+        trial_bytes=trial_bytes,
+        parallel_trials=parallel,
+        threads_per_trial=max(1, cores // parallel)
+    )
+    logger.info(
+        f"Resource plan: {plan.cores} cores, {plan.available_bytes / 1024 ** 3:.1f} GiB available, "
+        f"~{plan.trial_bytes / 1024 ** 2:.0f} MiB per trial -> {plan.parallel_trials} parallel trials "
+        f"x {plan.threads_per_trial} threads"
+    )
+    return plan
+
+def main():
+    """Main function to print the resource plan for a data shape."""
+    parser = argparse.ArgumentParser(description='Show the training resource plan')
+    parser.add_argument('--rows', type=int, required=True, help='Training rows')
+    parser.add_argument('--features', type=int, required=True, help='Feature columns')
+    parser.add_argument('--trials', type=int, default=27, help='Trials that can run concurrently')
+    parser.add_argument('--max-parallel', type=int, default=None, help='Cap on parallel trials')
+    parser.add_argument('--shared-data', action='store_true', help='Trials share one quantized matrix (threaded search)')
+
+    args = parser.parse_args()
+    print(plan_training(args.rows, args.features, args.trials, args.max_parallel, args.shared_data))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+serialization.py - Lean JSON encoding for list endpoints.
+
+List endpoints select plain column tuples and encode them straight to bytes
+here, as an array of row objects, as one array per column ("columnar"), or
+as an Arrow IPC stream, instead of building ORM objects, converting them with to_dict() and
+letting FastAPI validate and re-encode the result. Columns that already hold
+JSON text (fraud alert explanations) are validated and spliced into the
+output verbatim rather than converted to Python objects and re-serialized.
+
+orjson is used when installed; otherwise the standard library encoder is used.
+
+Usage (compare the ORM and lean list paths against the configured database):
+    python serialization.py [--limit N] [--repeat N]
+"""
+
+import json
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+from typing import Any, List, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class RawJSON(bytes):
+    """Bytes that are already valid JSON and are embedded as-is by dumps()."""
+
+def _default(value: Any) -> Any:
+    """Serialize datetimes for the standard library encoder."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _encode(value: Any) -> bytes:
+    """Encode a value that contains no RawJSON fragments."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":"), default=_default).encode("utf-8")
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact JSON bytes.
+
+    RawJSON values placed directly in the value, or directly inside a dict or
+    list, are embedded without re-encoding.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if isinstance(value, RawJSON):
+        return bytes(value)
+    if isinstance(value, dict) and any(isinstance(item, RawJSON) for item in value.values()):
+        return b"{" + b",".join(_encode(str(key)) + b":" + dumps(item) for key, item in value.items()) + b"}"
+    if isinstance(value, list) and any(isinstance(item, RawJSON) for item in value):
+        return b"[" + b",".join(dumps(item) for item in value) + b"]"
+    return _encode(value)
+
+def raw_json_text(text: Any, fallback: bytes = b"[]") -> bytes:
+    """
+    Return stored JSON text as bytes for verbatim embedding.
+
+    The text is always validated first, so one corrupted value cannot break
+    the JSON of the whole response: empty or invalid text falls back the same
+    way FraudAlert.to_dict does. With orjson, valid text is validated with
+    orjson.loads and embedded verbatim; without it, it is parsed and
+    re-encoded with the standard library.
+
+    Args:
+        text: Stored JSON text, or None
+        fallback: Encoded value used for empty or unusable text
+
+    Returns:
+        JSON bytes
+    """
+    if not text:
+        return fallback
+    stripped = text.strip()
+    if not stripped:
+        return fallback
+    if orjson is not None:
+        try:
+            orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            return fallback
+        return stripped.encode("utf-8")
+    try:
+        return _encode(json.loads(stripped))
+    except (json.JSONDecodeError, TypeError):
+        return fallback
+
+def encode_rows(columns: List[str], rows: Sequence[Sequence[Any]], raw_columns: Sequence[str] = ()) -> RawJSON:
+    """
+    Encode column tuples as a JSON array of objects.
+
+    Args:
+        columns: Column names, in row order
+        rows: Row tuples
+        raw_columns: Columns holding stored JSON text to embed verbatim
+
+    Returns:
+        RawJSON array
+    """
+    raw_indexes = [(columns.index(column), _encode(column)) for column in raw_columns]
+    plain_indexes = [index for index in range(len(columns)) if index not in {i for i, _ in raw_indexes}]
+
+    if not raw_indexes:
+        return RawJSON(_encode([{columns[i]: row[i] for i in plain_indexes} for row in rows]))
+
+    parts = []
+    for row in rows:
+        fields = [_encode({columns[i]: row[i] for i in plain_indexes})[1:-1]]
+        fields.extend(key + b":" + raw_json_text(row[index]) for index, key in raw_indexes)
+        parts.append(b"{" + b",".join(field for field in fields if field) + b"}")
+    return RawJSON(b"[" + b",".join(parts) + b"]")
+
+# Output formats of the list endpoints and their media types
+LIST_FORMATS = {
+    "json": "application/json",
+    "columnar": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+def encode_columns(columns: List[str], rows: Sequence[Sequence[Any]], raw_columns: Sequence[str] = ()) -> RawJSON:
+    """
+    Encode column tuples as a JSON object of column arrays.
+
+    Keys are written once instead of once per row, e.g.
+    {"id": [1, 2], "amount": [10.0, 25.5]}.
+
+    Args:
+        columns: Column names, in row order
+        rows: Row tuples
+        raw_columns: Columns holding stored JSON text to embed verbatim
+
+    Returns:
+        RawJSON object
+    """
+    parts = []
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows]
+        if column in raw_columns:
+            encoded = b"[" + b",".join(raw_json_text(value) for value in values) + b"]"
+        else:
+            encoded = _encode(values)
+        parts.append(_encode(column) + b":" + encoded)
+    return RawJSON(b"{" + b",".join(parts) + b"}")
+
+def encode_arrow(rows: Sequence[Sequence[Any]], schema) -> bytes:
+    """
+    Encode column tuples as an Arrow IPC stream (imports pyarrow lazily).
+
+    Args:
+        rows: Row tuples in schema column order
+        schema: pyarrow schema
+
+    Returns:
+        Arrow IPC stream bytes
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_arrays(
+        [pa.array([row[index] for row in rows], type=field.type) for index, field in enumerate(schema)],
+        schema=schema
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def main():
+    """Main function to benchmark ORM versus lean encoding of list pages."""
+    from db_models import SessionLocal, Transaction, FraudAlert, list_rows, paginate_by_keyset
+
+    parser = argparse.ArgumentParser(description='Benchmark list page encoding')
+    parser.add_argument('--limit', type=int, default=1000, help='Rows per page')
+    parser.add_argument('--repeat', type=int, default=20, help='Pages encoded per measurement')
+
+    args = parser.parse_args()
+
+    def orm_page(db, model):
+        rows = paginate_by_keyset(db.query(model), model, None, args.limit).all()
+        return json.dumps([row.to_dict() for row in rows]).encode("utf-8")
+
+    def lean_page(db, model):
+        columns, rows, _ = list_rows(db, model, args.limit)
+        return encode_rows(columns, rows, ("explanation",) if model is FraudAlert else ())
+
+    db = SessionLocal()
+    try:
+        for model in (Transaction, FraudAlert):
+            for name, page in (("orm", orm_page), ("lean", lean_page)):
+                db.expunge_all()
+                tracemalloc.start()
+                start = time.process_time()
+                for _ in range(args.repeat):
+                    page(db, model)
+                    db.expunge_all()
+                elapsed = (time.process_time() - start) / args.repeat
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{model.__tablename__:<14} {name:<5} {elapsed * 1000:8.2f} ms CPU/page  {peak / 1024:10.1f} KiB peak")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+snapshot.py - Local columnar snapshot of fraud_detection_data for repeated training runs.
+
+The table is written once to a directory holding one raw binary file per
+column (memory-mappable with numpy, dtypes as in db_utils' compact loader)
+and a manifest.json recording the row count, the largest primary key and
+each column's dtype. Later runs memory-map the columns instead of querying
+MySQL, and refresh() appends only rows whose primary key is above the
+manifest's max_key.
+
+The snapshot assumes the source table is append-only: updated or deleted
+rows are not picked up by refresh(); use rebuild() (or --rebuild) for that.
+Only one process should refresh a snapshot at a time.
+
+Sampling is applied to the memory-mapped columns with the same rules as the
+SQL sampling in db_utils, so hash and block samples match the rows a direct
+database read would return. The random method uses a seeded NumPy generator
+and selects different rows than ORDER BY RAND.
+
+Usage:
+    python snapshot.py [--rebuild] [--info] [--snapshot-dir PATH]
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from db_utils import (
+    get_db_engine, get_sampling_key, coerce_compact_chunk, compact_frame, _sample_blocks,
+    FRAUD_DATA_TABLE, SAMPLING_METHODS, COMPACT_SELECT, COMPACT_NUMERIC_DTYPES, COMPACT_CATEGORIES,
+    HASH_MULTIPLIER, HASH_RANGE, LOAD_CHUNK_SIZE
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Directory holding the snapshot columns and manifest
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "snapshot")
+)
+
+MANIFEST_VERSION = 1
+
+# Fixed width of the stored account names (PaySim names are 11 characters)
+NAME_WIDTH = 16
+
+# Columns stored in the snapshot and their dtypes
+SNAPSHOT_DTYPES: Dict[str, Any] = {
+    "key": np.int64,
+    **COMPACT_NUMERIC_DTYPES,
+    **{column: np.int8 for column in COMPACT_CATEGORIES},
+    "nameOrig": f"S{NAME_WIDTH}",
+    "nameDest": f"S{NAME_WIDTH}",
+}
+
+# Column order of the raw frame returned for the simulator (fraud_detection_data's layout)
+RAW_COLUMNS = [
+    "step", "type", "amount", "nameOrig", "oldbalanceOrg", "newbalanceOrig",
+    "nameDest", "oldbalanceDest", "newbalanceDest", "isFraud", "isFlaggedFraud"
+]
+
+class FraudDataSnapshot:
+    """Memory-mapped, incrementally refreshed copy of fraud_detection_data."""
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+        """
+        Initialize the snapshot.
+
+        Args:
+            snapshot_dir: Directory holding the snapshot
+        """
+        self.snapshot_dir = snapshot_dir
+        self.manifest_path = os.path.join(snapshot_dir, "manifest.json")
+
+    def _column_path(self, column: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{column}.bin")
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        """Return the manifest, or None if no usable snapshot exists."""
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("columns") != {
+            column: np.dtype(dtype).str for column, dtype in SNAPSHOT_DTYPES.items()
+        }:
+            logger.warning("Snapshot layout is out of date; it will be rebuilt")
+            return None
+        return manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Replace the manifest atomically."""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def rebuild(self, chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+        """
+        Discard the snapshot and write it again from the database.
+
+        Args:
+            chunk_size: Rows fetched per chunk
+
+        Returns:
+            Number of rows written
+        """
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        return self.refresh(chunk_size)
+
+    def refresh(self, chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+        """
+        Create the snapshot, or append rows added to the table since the last refresh.
+
+        Columns are appended first and the manifest is replaced last, so an
+        interrupted refresh leaves the previous snapshot intact; bytes past
+        the recorded row count are truncated on the next refresh.
+
+        Args:
+            chunk_size: Rows fetched per chunk
+
+        Returns:
+            Number of rows added
+        """
+        engine = get_db_engine()
+        key_name = get_sampling_key(engine)
+        key = engine.dialect.identifier_preparer.quote(key_name)
+
+        manifest = self.read_manifest()
+        if manifest is None:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "table": FRAUD_DATA_TABLE,
+                "key": key_name,
+                "row_count": 0,
+                "max_key": None,
+                "columns": {column: np.dtype(dtype).str for column, dtype in SNAPSHOT_DTYPES.items()},
+                "created_at": datetime.now().isoformat(),
+            }
+
+        # Drop anything an interrupted refresh appended past the recorded rows
+        files = {}
+        for column, dtype in SNAPSHOT_DTYPES.items():
+            f = open(self._column_path(column), "ab")
+            f.truncate(manifest["row_count"] * np.dtype(dtype).itemsize)
+            files[column] = f
+
+        where = f"WHERE {key} > :max_key" if manifest["max_key"] is not None else ""
+        query = text(
+            f"SELECT {COMPACT_SELECT}, nameOrig, nameDest, {key} AS snapshot_key "
+            f"FROM {FRAUD_DATA_TABLE} {where} ORDER BY {key}"
+        )
+        params = {"max_key": manifest["max_key"]} if manifest["max_key"] is not None else {}
+
+        added = 0
+        max_key = manifest["max_key"]
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+                for chunk in pd.read_sql(query, conn, params=params, chunksize=chunk_size):
+                    arrays = coerce_compact_chunk(chunk)
+                    arrays["key"] = chunk["snapshot_key"].to_numpy(dtype=np.int64)
+                    for column in ("nameOrig", "nameDest"):
+                        names = chunk[column].fillna("").astype(str)
+                        if (names.str.len() > NAME_WIDTH).any():
+                            raise ValueError(f"{column} values longer than {NAME_WIDTH} characters; raise NAME_WIDTH")
+                        arrays[column] = names.to_numpy(dtype=SNAPSHOT_DTYPES[column])
+                    for column, f in files.items():
+                        f.write(np.ascontiguousarray(arrays[column], dtype=SNAPSHOT_DTYPES[column]).tobytes())
+                    added += len(chunk)
+                    if len(chunk):
+                        max_key = int(arrays["key"][-1])
+        finally:
+            for f in files.values():
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+
+        manifest["row_count"] += added
+        manifest["max_key"] = max_key
+        manifest["updated_at"] = datetime.now().isoformat()
+        self._write_manifest(manifest)
+        logger.info(f"Snapshot refreshed: {added} rows added, {manifest['row_count']} rows total")
+        return added
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Memory-map every snapshot column read-only.
+
+        Returns:
+            Dictionary of column arrays
+        """
+        manifest = self.read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No snapshot in {self.snapshot_dir}; run refresh() first")
+        rows = manifest["row_count"]
+        return {
+            column: np.memmap(self._column_path(column), dtype=dtype, mode="r", shape=(rows,))
+            if rows else np.empty(0, dtype=dtype)
+            for column, dtype in SNAPSHOT_DTYPES.items()
+        }
+
+    def sample_index(
+        self,
+        columns: Dict[str, np.ndarray],
+        sample_size: Optional[float],
+        random_state: int = 42,
+        sampling_method: str = "hash",
+        stratified: bool = False
+    ) -> Optional[np.ndarray]:
+        """
+        Select sampled row positions with the same rules as db_utils' SQL sampling.
+
+        Args:
+            columns: Snapshot columns
+            sample_size: Fraction of rows to keep, or None for all
+            random_state: Random state for reproducibility
+            sampling_method: "random", "hash" or "block"
+            stratified: If True, keep every isFraud=1 row and sample only the rest
+
+        Returns:
+            Sorted row positions, or None for all rows
+        """
+        if sampling_method not in SAMPLING_METHODS:
+            raise ValueError(f"Sampling method must be one of {SAMPLING_METHODS}")
+        if sample_size is None or not 0.0 < sample_size < 1.0:
+            return None
+
+        keys = columns["key"]
+        fraud = columns["isFraud"] == 1
+
+        if sampling_method == "hash":
+            salt = np.uint64((random_state * 40503) % HASH_RANGE)
+            hashed = (keys.astype(np.uint64) * np.uint64(HASH_MULTIPLIER) + salt) % np.uint64(HASH_RANGE)
+            mask = hashed < np.uint64(int(sample_size * HASH_RANGE))
+        elif sampling_method == "block":
+            mask = np.zeros(len(keys), dtype=bool)
+            if len(keys):
+                for low, high in _sample_blocks(int(keys[0]), int(keys[-1]), sample_size, random_state):
+                    mask[np.searchsorted(keys, low):np.searchsorted(keys, high)] = True
+            if stratified:
+                mask &= ~fraud
+        else:
+            candidates = np.flatnonzero(~fraud) if stratified else np.arange(len(keys))
+            chosen = np.random.default_rng(random_state).choice(
+                candidates, size=int(len(keys) * sample_size), replace=False
+            ) if len(candidates) else candidates
+            mask = np.zeros(len(keys), dtype=bool)
+            mask[chosen] = True
+
+        if stratified:
+            mask |= fraud
+        return np.flatnonzero(mask)
+
+    def load(
+        self,
+        sample_size: Optional[float] = None,
+        random_state: int = 42,
+        sampling_method: str = "hash",
+        stratified: bool = False,
+        refresh: bool = True,
+        raw: bool = False
+    ) -> pd.DataFrame:
+        """
+        Load (a sample of) the snapshot, refreshing it from the database first.
+
+        Args:
+            sample_size: If provided, only a fraction of the data is loaded
+            random_state: Random state for reproducibility when sampling
+            sampling_method: "random", "hash" or "block"
+            stratified: If True, keep every isFraud=1 row and sample only the rest
+            refresh: Whether to pull new rows from the database first
+            raw: If True, return fraud_detection_data's columns (with account names)
+                 instead of the compact training columns
+
+        Returns:
+            DataFrame in compact (db_utils.compact_frame) or raw layout
+        """
+        if refresh or self.read_manifest() is None:
+            self.refresh()
+
+        columns = self.columns()
+        index = self.sample_index(columns, sample_size, random_state, sampling_method, stratified)
+        if index is not None:
+            columns = {column: values[index] for column, values in columns.items()}
+
+        if not raw:
+            df = compact_frame(columns)
+        else:
+            frame = compact_frame(columns)
+            frame["nameOrig"] = np.char.decode(np.asarray(columns["nameOrig"]), "ascii")
+            frame["nameDest"] = np.char.decode(np.asarray(columns["nameDest"]), "ascii")
+            df = frame[RAW_COLUMNS]
+
+        logger.info(f"Loaded {len(df)} rows from snapshot {self.snapshot_dir}")
+        return df
+
+def main():
+    """Main function to create, refresh or inspect the training data snapshot."""
+    parser = argparse.ArgumentParser(description='Maintain the local fraud_detection_data snapshot')
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, help='Snapshot directory')
+    parser.add_argument('--rebuild', action='store_true', help='Discard and rewrite the snapshot')
+    parser.add_argument('--info', action='store_true', help='Only print the manifest')
+    parser.add_argument('--chunk-size', type=int, default=LOAD_CHUNK_SIZE, help='Rows fetched per chunk')
+
+    args = parser.parse_args()
+
+    snapshot = FraudDataSnapshot(args.snapshot_dir)
+    if not args.info:
+        start = time.perf_counter()
+        if args.rebuild:
+            snapshot.rebuild(args.chunk_size)
+        else:
+            snapshot.refresh(args.chunk_size)
+        logger.info(f"Snapshot updated in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        df = snapshot.load(refresh=False)
+        logger.info(f"Full snapshot load: {len(df)} rows in {time.perf_counter() - start:.2f}s")
+
+    print(json.dumps(snapshot.read_manifest(), indent=2))
+
+if __name__ == "__main__":
+    main()
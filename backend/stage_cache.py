@@ -0,0 +1,185 @@
+"""
+stage_cache.py - Input-keyed cache of training pipeline stages.
+
+Each stage output (the split, preprocessed matrices; the resampled
+training set) is stored under a key hashed from everything that determines
+it: the data version, the sampling settings, the preprocessing configuration
+and the key of the stage it was computed from. Arrays are written as .npy
+files and opened with mmap_mode='r', so a cache hit costs almost no memory
+until the data is touched; other outputs (the fitted preprocessor) are
+pickled next to them.
+
+The data version summarizes the source rather than hashing every row (see
+db_utils.fraud_data_version): appends and deletes always change it, in-place
+edits only where a table checksum is available (MySQL). After editing rows
+elsewhere, clear the cache with --clear.
+
+Entries are written to a temporary directory and renamed into place, so a
+run interrupted while saving never leaves a partial entry behind.
+
+Usage:
+    python stage_cache.py [--clear] [--cache-dir PATH]
+"""
+
+import os
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import logging
+import argparse
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Directory holding cached stage outputs
+STAGE_CACHE_DIR = os.getenv(
+    "STAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "stage_cache")
+)
+
+def stage_key(stage: str, **inputs: Any) -> str:
+    """
+    Hash a stage name and its inputs into a cache key.
+
+    Args:
+        stage: Stage name
+        **inputs: JSON-serializable values the stage output depends on
+
+    Returns:
+        Hex digest
+    """
+    payload = json.dumps({"stage": stage, "inputs": inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+class StageCache:
+    """Stage outputs on local disk, keyed by stage_key."""
+
+    def __init__(self, cache_dir: str = STAGE_CACHE_DIR):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+        """
+        self.cache_dir = cache_dir
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{stage}-{key}")
+
+    def load(self, stage: str, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """
+        Open a cached stage output.
+
+        Args:
+            stage: Stage name
+            key: Key from stage_key
+
+        Returns:
+            Tuple of (memory-mapped arrays, unpickled objects), or None on a miss
+        """
+        entry = self._entry_dir(stage, key)
+        manifest_path = os.path.join(entry, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+            for name in manifest["arrays"]
+        }
+        objects = {}
+        if manifest["objects"]:
+            with open(os.path.join(entry, "objects.pkl"), "rb") as f:
+                objects = pickle.load(f)
+
+        logger.info(f"Stage cache hit: {stage} ({key})")
+        return arrays, objects
+
+    def save(self, stage: str, key: str, arrays: Dict[str, np.ndarray], objects: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store a stage output.
+
+        Args:
+            stage: Stage name
+            key: Key from stage_key
+            arrays: Arrays to store as memory-mappable .npy files
+            objects: Other picklable outputs
+        """
+        entry = self._entry_dir(stage, key)
+        tmp_entry = f"{entry}.tmp-{os.getpid()}"
+        os.makedirs(tmp_entry, exist_ok=True)
+
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_entry, f"{name}.npy"), np.asarray(array))
+            if objects:
+                with open(os.path.join(tmp_entry, "objects.pkl"), "wb") as f:
+                    pickle.dump(objects, f)
+            with open(os.path.join(tmp_entry, "manifest.json"), "w") as f:
+                json.dump({
+                    "stage": stage,
+                    "key": key,
+                    "arrays": list(arrays),
+                    "objects": sorted(objects or {}),
+                    "created_at": time.time()
+                }, f, indent=2)
+
+            if os.path.exists(entry):
+                shutil.rmtree(entry)
+            os.replace(tmp_entry, entry)
+            logger.info(f"Stage cached: {stage} ({key})")
+        except Exception:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            raise
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Return the manifest of every cache entry, by directory name."""
+        if not os.path.isdir(self.cache_dir):
+            return {}
+        result = {}
+        for name in sorted(os.listdir(self.cache_dir)):
+            manifest_path = os.path.join(self.cache_dir, name, "manifest.json")
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    result[name] = json.load(f)
+        return result
+
+    def clear(self) -> int:
+        """Remove every cache entry and return how many were removed."""
+        removed = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                removed += 1
+        return removed
+
+def main():
+    """Main function to inspect or clear the stage cache."""
+    parser = argparse.ArgumentParser(description='Inspect the training stage cache')
+    parser.add_argument('--cache-dir', default=STAGE_CACHE_DIR, help='Cache directory')
+    parser.add_argument('--clear', action='store_true', help='Remove every cache entry')
+
+    args = parser.parse_args()
+
+    cache = StageCache(args.cache_dir)
+    if args.clear:
+        logger.info(f"Removed {cache.clear()} cache entries")
+        return
+
+    for name, manifest in cache.entries().items():
+        entry = os.path.join(args.cache_dir, name)
+        size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+        print(f"{name:<50} {size / (1024 * 1024):10.1f} MiB  arrays={','.join(manifest['arrays'])}")
+
+if __name__ == "__main__":
+    main()
@@ -37,14 +37,14 @@ import {
 import { Bar, Pie } from 'react-chartjs-2';
 import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend, ArcElement, PointElement, LineElement, Filler } from 'chart.js';
 import { motion } from 'framer-motion';
-import { getTransactions, getAlerts, getStats, getDashboardData } from '../services/api';
+import { getTransactions, getAlerts, getStats, getDashboardData, getDashboardSnapshot } from '../services/api';
 import { CSVLink } from 'react-csv';
   FaUserCog
 } from 'react-icons/fa';
 import { Bar, Pie, Line } from 'react-chartjs-2';
 import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend, ArcElement, PointElement, LineElement, Filler } from 'chart.js';
 import { motion, AnimatePresence } from 'framer-motion';
-import { getTransactions, getAlerts, getStats, getDashboardData } from '../services/api';
+import { getTransactions, getAlerts, getStats, getDashboardData, getDashboardSnapshot } from '../services/api';
 import { CSVLink } from 'react-csv';
 import Skeleton from 'react-loading-skeleton';
 import 'react-loading-skeleton/dist/skeleton.css';
@@ -201,13 +201,13 @@ const Dashboard = () => {
     try {
       setLoading(true);
 
-      // Use the getDashboardData function from the API service
-      const dashboardResponse = await getDashboardData();
-
-      // Get recent transactions and alerts
-      const transactionsResponse = await getTransactions({ limit: 5 });
-      const alertsResponse = await getAlerts();
-      const statsResponse = await getStats();
+      // Load KPIs, recent transactions and alerts in a single request
+      const snapshotResponse = await getDashboardSnapshot({ transactions_limit: 5 });
+      const snapshot = snapshotResponse.data;
+      const dashboardResponse = { data: snapshot.dashboard };
+      const transactionsResponse = { data: snapshot.recent_transactions };
+      const alertsResponse = { data: snapshot.recent_alerts };
+      const statsResponse = { data: snapshot.stats };
 
       // Update states with the fetched data
       setDashboardData(dashboardResponse.data);
@@ -14,7 +14,7 @@ import {
 } from 'react-bootstrap';
 import { useNavigate } from 'react-router-dom';
 import { FaSearch, FaFilter, FaSync, FaPause, FaPlay, FaArrowDown } from 'react-icons/fa';
-import { getTransactions } from '../services/api';
+import { searchTransactions } from '../services/api';
 import { initSocket, closeSocket } from '../services/socket';
 import { motion, AnimatePresence } from 'framer-motion';
 import './TransactionsPage.css';
@@ -65,7 +65,7 @@ const TransactionsPage = () => {
     }
 
     if (filters.accountId) {
-      params.account_id = filters.accountId;
+      params.account = filters.accountId;
     }
 
     if (filters.isFraud !== '') {
@@ -75,15 +75,24 @@ const TransactionsPage = () => {
     return params;
   }, [filters]);
 
+  // Keyset cursors for pages already visited with the current filters, by page number
+  const pageCursors = useRef({});
+
   // Fetch transactions with filters and pagination
   const fetchTransactions = useCallback(async (page = 1, size = 20, filterParams = {}) => {
     try {
       setLoading(true);
 
-      // Build query parameters
+      if (page === 1) {
+        pageCursors.current = {};
+      }
+
+      // Build query parameters; use the keyset cursor when the page follows one already seen
+      const cursor = pageCursors.current[page];
       const params = {
-        offset: (page - 1) * size,
         limit: size,
+        count: 'estimate',
+        ...(cursor ? { cursor } : { offset: (page - 1) * size }),
         ...filterParams
       };
 
@@ -95,12 +104,15 @@ const TransactionsPage = () => {
       });
 
       // Make API request using our API service
-      const response = await getTransactions(params);
+      const response = await searchTransactions(params);
 
       // Update state
       setTransactions(response.data);
+      if (response.headers['x-next-cursor']) {
+        pageCursors.current[page + 1] = response.headers['x-next-cursor'];
+      }
 
-      // Calculate total pages (assuming API returns total count in headers)
+      // Calculate total pages from the (estimated) total count header
       const totalCount = parseInt(response.headers['x-total-count'] || '0', 10);
       setTotalPages(Math.ceil(totalCount / size) || 1);
 
@@ -122,6 +122,18 @@ export const getTransactions = (params) => {
     });
 };
 
+// Server-side filtered search; only returns the columns shown in the transactions table
+export const searchTransactions = (params) => {
+  return api.get("/transactions/search", { params })
+    .catch(error => {
+      console.warn("Using mock transaction data due to API error:", error);
+      return {
+        data: mockTransactions.map(t => ({...t, isMockData: true})),
+        headers: { 'x-total-count': mockTransactions.length.toString() }
+      };
+    });
+};
+
 export const getTransaction = (id) => {
   return api.get(`/transactions/${id}`)
     .catch(error => {
@@ -167,6 +179,29 @@ export const getDashboardData = () => {
     });
 };
 
+// Everything the dashboard renders on load in one request, falling back to the individual endpoints
+export const getDashboardSnapshot = (params) => {
+  return api.get("/dashboard/snapshot", { params })
+    .catch(async error => {
+      console.warn("Dashboard snapshot unavailable, loading endpoints individually:", error);
+      const [dashboard, transactions, alerts, stats] = await Promise.all([
+        getDashboardData(),
+        getTransactions({ limit: params?.transactions_limit }),
+        getAlerts(),
+        getStats()
+      ]);
+      return {
+        data: {
+          dashboard: dashboard.data,
+          recent_transactions: transactions.data,
+          recent_alerts: alerts.data,
+          stats: stats.data,
+          type_breakdown: []
+        }
+      };
+    });
+};
+
 // Interceptor for handling errors
 api.interceptors.response.use(
   (response) => response,
@@ -1,10 +1,11 @@
-import { io } from 'socket.io-client';
 import { toast } from 'react-hot-toast';
 
-// Create a socket instance using the same base URL as the API
+// Live feed is served by the API as Server-Sent Events
 const API_URL = process.env.REACT_APP_API_URL || window.location.hostname === 'localhost' 
-  ? "http://localhost:8000" 
-  : `http://${window.location.hostname}:8000`;
+  ? "http://localhost:8002" 
+  : `http://${window.location.hostname}:8002`;
+
+const STREAM_URL = `${API_URL}/stream/transactions?include_alerts=false`;
 
 // Create a socket instance
 let socket;
@@ -35,52 +36,73 @@ const generateMockTransaction = () => {
   };
 };
 
+// Start the mock transaction stream used when the backend is not available
+const startMockStream = (callback, reason) => {
+  if (!window.mockTransactionInterval) {
+    console.warn(`Using mock transaction stream due to ${reason}`);
+    toast('Using mock transaction data stream', {
+      icon: '⚠️',
+      id: 'socket-mock',
+      duration: 4000,
+    });
+
+    // Send mock transaction every 5-10 seconds
+    window.mockTransactionInterval = setInterval(() => {
+      if (callback && typeof callback === 'function') {
+        callback(generateMockTransaction());
+      }
+    }, 5000 + Math.random() * 5000);
+  }
+};
+
+// Stop the mock transaction stream, if one is running
+const stopMockStream = () => {
+  if (window.mockTransactionInterval) {
+    clearInterval(window.mockTransactionInterval);
+    window.mockTransactionInterval = null;
+  }
+};
+
 // Initialize socket connection
 export const initSocket = (callback) => {
   try {
-    socket = io(API_URL);
+    socket = new EventSource(STREAM_URL);
+    let connected = false;
 
-    socket.on('connect', () => {
+    socket.onopen = () => {
       console.log('Socket connected');
+      connected = true;
+
+      // EventSource keeps retrying after a failed first attempt; real events replace the mock stream
+      stopMockStream();
       toast.success('Real-time connection established', {
         id: 'socket-connect',
         duration: 3000,
       });
-    });
-
-    socket.on('disconnect', () => {
-      console.log('Socket disconnected');
-      toast.error('Real-time connection lost', {
-        id: 'socket-disconnect',
-        duration: 3000,
-      });
-    });
+    };
+
+    socket.onerror = (error) => {
+      if (connected) {
+        // EventSource reconnects on its own after a dropped connection
+        console.log('Socket disconnected');
+        connected = false;
+        toast.error('Real-time connection lost', {
+          id: 'socket-disconnect',
+          duration: 3000,
+        });
+        return;
+      }
 
-    socket.on('connect_error', (error) => {
       console.error('Socket connection error:', error);
 
       // If we can't connect to the socket, set up a mock data interval
-      if (!window.mockTransactionInterval) {
-        console.warn('Using mock transaction stream due to socket connection error');
-        toast('Using mock transaction data stream', {
-          icon: '⚠️',
-          id: 'socket-mock',
-          duration: 4000,
-        });
-
-        // Send mock transaction every 5-10 seconds
-        window.mockTransactionInterval = setInterval(() => {
-          if (callback && typeof callback === 'function') {
-            callback(generateMockTransaction());
-          }
-        }, 5000 + Math.random() * 5000);
-      }
-    });
+      startMockStream(callback, 'socket connection error');
+    };
 
     // Listen for new transactions
-    socket.on('new_transaction', (transaction) => {
+    socket.addEventListener('new_transaction', (event) => {
       if (callback && typeof callback === 'function') {
-        callback(transaction);
+        callback(JSON.parse(event.data));
       }
     });
 
@@ -89,21 +111,7 @@ export const initSocket = (callback) => {
     console.error('Error initializing socket:', error);
 
     // Set up mock data interval if socket initialization fails
-    if (!window.mockTransactionInterval) {
-      console.warn('Using mock transaction stream due to socket initialization error');
-      toast('Using mock transaction data stream', {
-        icon: '⚠️',
-        id: 'socket-mock',
-        duration: 4000,
-      });
-
-      // Send mock transaction every 5-10 seconds
-      window.mockTransactionInterval = setInterval(() => {
-        if (callback && typeof callback === 'function') {
-          callback(generateMockTransaction());
-        }
-      }, 5000 + Math.random() * 5000);
-    }
+    startMockStream(callback, 'socket initialization error');
 
     return null;
   }
@@ -112,14 +120,11 @@ export const initSocket = (callback) => {
 // Clean up socket connection
 export const closeSocket = () => {
   if (socket) {
-    socket.disconnect();
+    socket.close();
   }
 
   // Clear mock interval if it exists
-  if (window.mockTransactionInterval) {
-    clearInterval(window.mockTransactionInterval);
-    window.mockTransactionInterval = null;
-  }
+  stopMockStream();
 };
 
 export default {